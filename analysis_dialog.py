@@ -0,0 +1,417 @@
+# Fenêtre du rapport d'analyse exploratoire.
+# Importé à la première ouverture du rapport : matplotlib et scipy ne ralentissent pas le démarrage.
+import os
+from collections import OrderedDict
+
+# Configure l'environnement pour forcer Matplotlib à utiliser PyQt6
+os.environ["QT_API"] = "pyqt6"
+import matplotlib
+
+matplotlib.use("QtAgg")
+
+import numpy as np
+from matplotlib import cbook
+from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
+from matplotlib.figure import Figure
+from scipy import stats
+from PyQt6.QtWidgets import (
+    QWidget, QVBoxLayout, QPushButton, QLabel, QComboBox, QDialog, QTextEdit, QTabWidget,
+    QTableWidget, QTableWidgetItem, QHeaderView, QGridLayout, QHBoxLayout, QMessageBox
+)
+from PyQt6.QtGui import QFont
+
+from core import load_numeric_values
+
+# Nombre de variables dont les données de graphiques restent en mémoire
+PLOT_CACHE_SIZE = 64
+HISTOGRAM_BINS = 20
+# Points tracés au plus : le temps de rendu ne dépend plus du nombre d'enregistrements
+QQ_POINTS = 500
+MAX_FLIERS = 200
+
+
+def spread_sample(sorted_values, size):
+    """Au plus size valeurs régulièrement réparties dans un tableau trié, extrêmes compris"""
+    if len(sorted_values) <= size:
+        return sorted_values
+    return sorted_values[np.linspace(0, len(sorted_values) - 1, size).round().astype(int)]
+
+
+def qq_points(values, size):
+    """Au plus size points du QQ plot : quantiles des valeurs face à ceux de la loi normale,
+    aux mêmes probabilités régulièrement espacées (sans trier toutes les valeurs)"""
+    if len(values) <= size:
+        probabilities = (np.arange(1, len(values) + 1) - 0.5) / len(values)
+        return stats.norm.ppf(probabilities), np.sort(values)
+    probabilities = (np.arange(1, size + 1) - 0.5) / size
+    return stats.norm.ppf(probabilities), np.quantile(values, probabilities)
+
+
+def compute_plot_data(values):
+    """Données des trois graphiques d'une variable : effectifs par classe, boîte et quantiles.
+
+    Seuls des résumés de taille fixe sont conservés : MAX_FLIERS valeurs extrêmes
+    et QQ_POINTS quantiles (la droite est ajustée sur ces quantiles). None si values est vide.
+    """
+    if not len(values):
+        return None
+    counts, edges = np.histogram(values, bins=HISTOGRAM_BINS)
+    box_stats = cbook.boxplot_stats(values)
+    for box in box_stats:
+        box["fliers"] = spread_sample(np.sort(box["fliers"]), MAX_FLIERS)
+    theoretical, ordered = qq_points(values, QQ_POINTS)
+    slope, intercept = np.polyfit(theoretical, ordered, 1)
+    return {
+        "hist": (counts, edges),
+        "box": box_stats,
+        "qq": (theoretical, ordered, slope, intercept),
+    }
+
+
+def load_plot_data(db, mode, var_name):
+    """Lit les valeurs d'une variable et calcule ses graphiques, dans le thread base de données"""
+    return compute_plot_data(load_numeric_values(db, mode, var_name))
+
+
+class MplCanvas(FigureCanvas):
+    """Classe pour intégrer des graphiques matplotlib dans PyQt"""
+
+    def __init__(self, parent=None, width=5, height=4, dpi=100):
+        fig = Figure(figsize=(width, height), dpi=dpi)
+        self.axes = fig.add_subplot(111)
+        super().__init__(fig)
+        self.setParent(parent)
+
+
+class AnalysisDialog(QDialog):
+    """Rapport d'analyse ; les valeurs d'une variable numérique ne sont lues (par db_client)
+    qu'à l'affichage de ses graphiques"""
+
+    def __init__(self, report, parent=None, db_client=None, mode=None):
+        super().__init__(parent)
+        self.db_client = db_client
+        self.mode = mode
+        self.setWindowTitle("Rapport d'Analyse Exploratoire")
+        self.setMinimumSize(1000, 700)
+
+        layout = QVBoxLayout()
+
+        # Onglets pour différents types d'analyse
+        self.tabs = QTabWidget()
+
+        # Onglet Résumé
+        self.summary_tab = QWidget()
+        summary_layout = QVBoxLayout()
+        self.summary_text = QTextEdit()
+        self.summary_text.setReadOnly(True)
+        self.summary_text.setFont(QFont("Courier New", 10))
+        summary_layout.addWidget(self.summary_text)
+        self.summary_tab.setLayout(summary_layout)
+        self.tabs.addTab(self.summary_tab, "Résumé")
+
+        # Onglet Statistiques descriptives (calculées en flux, quantiles approchés)
+        self.descriptive_tab = QWidget()
+        descriptive_layout = QVBoxLayout()
+        self.descriptive_table = QTableWidget()
+        self.descriptive_table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        descriptive_layout.addWidget(self.descriptive_table)
+        self.descriptive_tab.setLayout(descriptive_layout)
+        self.tabs.addTab(self.descriptive_tab, "Statistiques Descriptives")
+
+        # Onglet Données Manquantes (seulement le tableau)
+        self.missing_tab = QWidget()
+        missing_layout = QVBoxLayout()
+
+        # Tableau pour les données manquantes
+        self.missing_table = QTableWidget()
+        self.missing_table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        missing_layout.addWidget(self.missing_table)
+
+        self.missing_tab.setLayout(missing_layout)
+        self.tabs.addTab(self.missing_tab, "Données Manquantes")
+
+        # Onglet Distributions Numériques
+        self.dist_tab = QWidget()
+        dist_layout = QVBoxLayout()
+
+        # Sélecteur de variable numérique
+        self.numeric_var_selector = QComboBox()
+        dist_layout.addWidget(QLabel("Sélectionnez une variable numérique:"))
+        dist_layout.addWidget(self.numeric_var_selector)
+
+        # Conteneur pour les graphiques : les trois figures sont créées une fois puis redessinées
+        self.dist_graph_container = QWidget()
+        self.dist_graph_layout = QGridLayout()
+        self.dist_graph_container.setLayout(self.dist_graph_layout)
+        self.boxplot_canvas = MplCanvas(self, width=5, height=4, dpi=100)
+        self.hist_canvas = MplCanvas(self, width=5, height=4, dpi=100)
+        self.qq_canvas = MplCanvas(self, width=5, height=4, dpi=100)
+        self.dist_graph_layout.addWidget(self.boxplot_canvas, 0, 0)
+        self.dist_graph_layout.addWidget(self.hist_canvas, 0, 1)
+        self.dist_graph_layout.addWidget(self.qq_canvas, 1, 0, 1, 2)
+        self.plot_data = OrderedDict()  # Variable -> données des graphiques, les plus récentes en dernier
+        self.plot_loading = set()
+
+        dist_layout.addWidget(self.dist_graph_container)
+        self.dist_tab.setLayout(dist_layout)
+        self.tabs.addTab(self.dist_tab, "Distributions Numériques")
+
+        # Onglet Fréquences des variables catégorielles
+        self.freq_tab = QWidget()
+        freq_layout = QVBoxLayout()
+        self.categorical_var_selector = QComboBox()
+        freq_layout.addWidget(QLabel("Sélectionnez une variable catégorielle:"))
+        freq_layout.addWidget(self.categorical_var_selector)
+        freq_content = QHBoxLayout()
+        self.freq_table = QTableWidget()
+        self.freq_table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.freq_canvas = MplCanvas(self, width=5, height=4, dpi=100)
+        freq_content.addWidget(self.freq_table, 1)
+        freq_content.addWidget(self.freq_canvas, 2)
+        freq_layout.addLayout(freq_content)
+        self.freq_tab.setLayout(freq_layout)
+        self.tabs.addTab(self.freq_tab, "Fréquences")
+
+        # Onglet Tests de Normalité
+        self.normality_tab = QWidget()
+        normality_layout = QVBoxLayout()
+        self.normality_table = QTableWidget()
+        self.normality_table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        normality_layout.addWidget(self.normality_table)
+        self.normality_tab.setLayout(normality_layout)
+        self.tabs.addTab(self.normality_tab, "Tests de Normalité")
+
+        layout.addWidget(self.tabs)
+
+        # Bouton Fermer
+        btn_close = QPushButton("Fermer")
+        btn_close.clicked.connect(self.accept)
+        btn_close.setStyleSheet("background-color: #4267B2; color: white;")
+        layout.addWidget(btn_close)
+
+        self.setLayout(layout)
+
+        # Afficher le rapport
+        self.display_report(report)
+
+    def display_report(self, report):
+        # Afficher le résumé
+        self.summary_text.setPlainText(report['summary'])
+
+        # Afficher les statistiques descriptives
+        self.display_descriptive_stats(report.get('descriptive_stats', {}))
+
+        # Afficher les données manquantes dans un tableau
+        self.display_missing_table(report['missing_data'])
+
+        # Afficher les distributions numériques
+        self.setup_numeric_vars(report['numeric_vars'])
+
+        # Afficher les tableaux de fréquences
+        self.setup_frequency_tables(report.get('frequency_tables', {}))
+
+        # Afficher les tests de normalité
+        self.display_normality_tests(report['normality_tests'])
+
+    def setup_frequency_tables(self, frequency_tables):
+        """Configure le sélecteur de variables catégorielles"""
+        self.categorical_var_selector.clear()
+        self.frequency_tables = frequency_tables
+        for var in frequency_tables:
+            self.categorical_var_selector.addItem(var)
+
+        if frequency_tables:
+            self.categorical_var_selector.currentIndexChanged.connect(self.display_frequency_table)
+            self.display_frequency_table(0)
+
+    def display_frequency_table(self, index):
+        """Affiche le tableau et le diagramme en barres de la variable catégorielle sélectionnée"""
+        var_name = self.categorical_var_selector.currentText()
+        if not var_name or not self.frequency_tables:
+            return
+
+        table = self.frequency_tables[var_name]
+        rows = list(table["rows"])
+        if table["missing"] is not None:
+            rows.append(dict(table["missing"], label="Manquant"))
+
+        count_header = "Oui" if table["type"] == "CATEGORIELLE_MULTIPLE" else "Effectif"
+        self.freq_table.setRowCount(len(rows))
+        self.freq_table.setColumnCount(3)
+        self.freq_table.setHorizontalHeaderLabels(["Modalité", count_header, "%"])
+        for i, row in enumerate(rows):
+            self.freq_table.setItem(i, 0, QTableWidgetItem(row["label"]))
+            self.freq_table.setItem(i, 1, QTableWidgetItem(str(row["count"])))
+            self.freq_table.setItem(i, 2, QTableWidgetItem(f"{row['percentage']:.1f}%"))
+        self.freq_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+
+        ax = self.freq_canvas.axes
+        ax.clear()
+        positions = np.arange(len(rows))
+        ax.barh(positions, [row["count"] for row in rows], color='#3498db', edgecolor='black')
+        ax.set_yticks(positions, [row["label"] for row in rows])
+        ax.invert_yaxis()
+        ax.set_title(f'Fréquences de {var_name}')
+        ax.set_xlabel(count_header)
+        ax.grid(axis='x', linestyle='--', alpha=0.7)
+        self.freq_canvas.figure.tight_layout()
+        self.freq_canvas.draw_idle()
+
+    def display_descriptive_stats(self, descriptive_stats):
+        """Affiche les statistiques descriptives des variables numériques"""
+        if not descriptive_stats:
+            return
+
+        headers = ["Variable", "N", "Manquants", "Moyenne", "Écart-type", "Min", "Q1", "Médiane", "Q3",
+                   "Max", "Asymétrie", "Aplatissement"]
+        keys = ["n", "missing", "mean", "std", "min", "q1", "median", "q3", "max", "skewness", "kurtosis"]
+        self.descriptive_table.setRowCount(len(descriptive_stats))
+        self.descriptive_table.setColumnCount(len(headers))
+        self.descriptive_table.setHorizontalHeaderLabels(headers)
+
+        for i, (var, values) in enumerate(descriptive_stats.items()):
+            self.descriptive_table.setItem(i, 0, QTableWidgetItem(var))
+            for j, key in enumerate(keys, start=1):
+                value = values.get(key)
+                text = "" if value is None else str(value) if isinstance(value, int) else f"{value:.4g}"
+                self.descriptive_table.setItem(i, j, QTableWidgetItem(text))
+
+        self.descriptive_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+
+    def display_missing_table(self, missing_data):
+        """Affiche les données manquantes dans un tableau"""
+        if not missing_data:
+            return
+
+        # Afficher les données dans un tableau
+        self.missing_table.setRowCount(len(missing_data))
+        self.missing_table.setColumnCount(4)
+        self.missing_table.setHorizontalHeaderLabels(["Variable", "% Manquant", "Type", "Total Manquant"])
+
+        for i, (var, data) in enumerate(missing_data.items()):
+            self.missing_table.setItem(i, 0, QTableWidgetItem(var))
+            self.missing_table.setItem(i, 1, QTableWidgetItem(f"{data['percentage']:.2f}%"))
+            self.missing_table.setItem(i, 2, QTableWidgetItem(data['type']))
+            self.missing_table.setItem(i, 3, QTableWidgetItem(str(data['count'])))
+
+        self.missing_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+
+    def setup_numeric_vars(self, numeric_vars):
+        """Configure le sélecteur de variables numériques"""
+        self.numeric_var_selector.clear()
+        self.numeric_vars = numeric_vars
+        self.plot_data.clear()
+
+        for var in numeric_vars.keys():
+            self.numeric_var_selector.addItem(var)
+
+        if numeric_vars:
+            self.numeric_var_selector.currentIndexChanged.connect(self.plot_numeric_distribution)
+            self.plot_numeric_distribution(0)
+
+    def plot_numeric_distribution(self, index):
+        """Affiche les graphiques pour la variable numérique sélectionnée"""
+        var_name = self.numeric_var_selector.currentText()
+        if not var_name or not self.numeric_vars:
+            return
+
+        if var_name not in self.plot_data:
+            self.load_plot_data(var_name)
+            return
+        self.plot_data.move_to_end(var_name)
+        self.draw_distribution(var_name, self.plot_data[var_name])
+
+    def load_plot_data(self, var_name):
+        """Demande les données des graphiques au thread base de données"""
+        if self.db_client is None or var_name in self.plot_loading:
+            return
+        self.plot_loading.add(var_name)
+        for canvas in (self.boxplot_canvas, self.hist_canvas, self.qq_canvas):
+            canvas.axes.clear()
+            canvas.axes.set_title(f"Chargement de {var_name}...")
+            canvas.draw_idle()
+
+        def on_loaded(data):
+            self.plot_loading.discard(var_name)
+            self.plot_data[var_name] = data
+            if len(self.plot_data) > PLOT_CACHE_SIZE:
+                self.plot_data.popitem(last=False)
+            if self.numeric_var_selector.currentText() == var_name:
+                self.draw_distribution(var_name, data)
+
+        def on_error(error):
+            self.plot_loading.discard(var_name)
+            QMessageBox.warning(self, "Erreur", f"Lecture des valeurs de {var_name} impossible : {error}")
+
+        self.db_client.submit(load_plot_data, self.mode, var_name, on_done=on_loaded, on_error=on_error)
+
+    def draw_distribution(self, var_name, data):
+        """Redessine les trois graphiques à partir de compute_plot_data"""
+        if data is None:
+            for canvas in (self.boxplot_canvas, self.hist_canvas, self.qq_canvas):
+                canvas.axes.clear()
+                canvas.axes.set_title(f"{var_name} : aucune valeur numérique")
+                canvas.draw_idle()
+            return
+
+        # Boxplot
+        ax_box = self.boxplot_canvas.axes
+        ax_box.clear()
+        ax_box.bxp(data["box"], vert=False)
+        ax_box.set_title(f'Boxplot de {var_name}')
+        ax_box.set_xlabel('Valeurs')
+        ax_box.grid(axis='x', linestyle='--', alpha=0.7)
+
+        # Histogramme
+        ax_hist = self.hist_canvas.axes
+        ax_hist.clear()
+        counts, edges = data["hist"]
+        ax_hist.bar(edges[:-1], counts, width=np.diff(edges), align='edge', color='#3498db', edgecolor='black')
+        ax_hist.set_title(f'Distribution de {var_name}')
+        ax_hist.set_xlabel('Valeurs')
+        ax_hist.set_ylabel('Fréquence')
+        ax_hist.grid(axis='y', linestyle='--', alpha=0.7)
+
+        # QQ Plot
+        ax_qq = self.qq_canvas.axes
+        ax_qq.clear()
+        theoretical, ordered, slope, intercept = data["qq"]
+        ax_qq.plot(theoretical, ordered, 'bo')
+        ax_qq.plot(theoretical, slope * theoretical + intercept, 'r-')
+        ax_qq.set_xlabel('Theoretical quantiles')
+        ax_qq.set_ylabel('Ordered Values')
+        ax_qq.set_title(f'QQ Plot de {var_name}')
+        ax_qq.grid(True, linestyle='--', alpha=0.7)
+
+        for canvas in (self.boxplot_canvas, self.hist_canvas, self.qq_canvas):
+            canvas.draw_idle()
+
+    def display_normality_tests(self, normality_tests):
+        """Affiche les résultats des tests de normalité dans un tableau"""
+        if not normality_tests:
+            return
+
+        self.normality_table.setRowCount(len(normality_tests))
+        self.normality_table.setColumnCount(6)
+        self.normality_table.setHorizontalHeaderLabels([
+            "Variable", "Test", "p-value", "Normalité",
+            "Kolmogorov-Smirnov (p-value)", "Normalité (KS)"
+        ])
+
+        for i, (var, tests) in enumerate(normality_tests.items()):
+            self.normality_table.setItem(i, 0, QTableWidgetItem(var))
+
+            # Shapiro-Wilk, ou le test qui le remplace sur les grands échantillons
+            shapiro_p = tests.get('shapiro_p', np.nan)
+            shapiro_norm = "Oui" if shapiro_p > 0.05 else "Non"
+            self.normality_table.setItem(i, 1, QTableWidgetItem(tests.get('test', "Shapiro-Wilk")))
+            self.normality_table.setItem(i, 2, QTableWidgetItem(f"{shapiro_p:.4f}"))
+            self.normality_table.setItem(i, 3, QTableWidgetItem(shapiro_norm))
+
+            # Kolmogorov-Smirnov
+            ks_p = tests.get('ks_p', np.nan)
+            ks_norm = "Oui" if ks_p > 0.05 else "Non"
+            self.normality_table.setItem(i, 4, QTableWidgetItem(f"{ks_p:.4f}"))
+            self.normality_table.setItem(i, 5, QTableWidgetItem(ks_norm))
+
+        self.normality_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
@@ -0,0 +1,57 @@
+# Lecture d'un grand tableau de variables Word : python-docx contre lecture en flux du XML.
+#   python benchmarks/docx_parser.py [--variables 5000] [--merged] [--repeat 3]
+# Le document synthétique est généré dans un dossier temporaire ; les deux lectures
+# doivent produire exactement les mêmes variables.
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core import read_variables_from_docx, read_variables_with_python_docx
+from synthetic import write_variables_docx
+
+
+def best_time(parse, path, repeat):
+    """Meilleur temps (s) sur repeat lectures, et les variables lues"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        variables = parse(path)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, variables
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Lecture des tableaux de variables .docx")
+    parser.add_argument("--variables", type=int, default=5000)
+    parser.add_argument("--merged", action="store_true", help="descriptions fusionnées verticalement")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "variables.docx")
+        write_variables_docx(path, args.variables, args.merged)
+        print(f"Document : {args.variables} variables, {os.path.getsize(path) / 1024:.0f} Ko")
+
+        results = {}
+        for name, parse in (("python-docx", read_variables_with_python_docx),
+                            ("flux XML", read_variables_from_docx)):
+            results[name] = best_time(parse, path, args.repeat)
+
+    print(f"{'Lecture':<16}{'temps (ms)':>12}")
+    for name, (elapsed, _) in results.items():
+        print(f"{name:<16}{elapsed * 1000:>12.1f}")
+
+    reference, fast = ([var.to_dict() for var in variables] for _, variables in results.values())
+    if reference != fast:
+        print("ÉCHEC : les deux lectures ne donnent pas les mêmes variables", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
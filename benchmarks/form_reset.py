@@ -0,0 +1,80 @@
+# Latence entre l'enregistrement d'une fiche et la fiche suivante sur un grand formulaire.
+#   python benchmarks/form_reset.py [--variables 300] [--records 20]
+# Compare la remise à zéro en place (reset_form) à la reconstruction complète (generate_form).
+import argparse
+import os
+import statistics
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt6.QtWidgets import QApplication, QComboBox, QLineEdit, QMessageBox
+
+import main
+from synthetic import make_variables
+
+
+def fill_form(window, i):
+    for var in window.variables:
+        widget = window.inputs[var.nom]
+        if var.type_variable == "CATEGORIELLE_MULTIPLE":
+            for _, combo in widget:
+                combo.setCurrentIndex(1 + i % 2)
+        elif var.type_variable == "TEMPS":
+            widget.setText("01:02:03")
+        elif isinstance(widget, QLineEdit):
+            widget.setText(str(i))
+        elif isinstance(widget, QComboBox):
+            widget.setCurrentIndex(1 + i % (widget.count() - 1))
+
+
+def save_latencies(app, window, records):
+    """Temps (ms) entre save_data et le formulaire prêt pour la fiche suivante"""
+    latencies = []
+    for i in range(records):
+        fill_form(window, i)
+        start = time.perf_counter()
+        window.save_data()
+        while window.db_client.is_busy():
+            app.processEvents()
+        app.processEvents()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def main_benchmark(argv=None):
+    parser = argparse.ArgumentParser(description="Latence enregistrement → fiche suivante")
+    parser.add_argument("--variables", type=int, default=300)
+    parser.add_argument("--records", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    # Pas de boîte de dialogue bloquante pendant la mesure
+    QMessageBox.information = staticmethod(lambda *a, **k: None)
+    app = QApplication.instance() or QApplication([])
+    window = main.ExDForm()
+    window.show()
+    window.variables = make_variables(args.variables)
+    window.connect_to_database(":memory:")
+    start = time.perf_counter()
+    window.generate_form()
+    print(f"Construction du formulaire ({args.variables} variables) : {(time.perf_counter() - start) * 1000:.1f} ms")
+    while window.db_client.is_busy():
+        app.processEvents()
+
+    results = {}
+    results["remise à zéro en place"] = save_latencies(app, window, args.records)
+    window.reset_form = window.generate_form
+    results["reconstruction complète"] = save_latencies(app, window, args.records)
+
+    print(f"{'Méthode':<28}{'médiane (ms)':>14}{'max (ms)':>12}")
+    for name, latencies in results.items():
+        print(f"{name:<28}{statistics.median(latencies):>14.1f}{max(latencies):>12.1f}")
+
+    window.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_benchmark())
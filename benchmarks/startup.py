@@ -0,0 +1,99 @@
+# Mesure du temps de démarrage de ExDForm, module par module (python -X importtime).
+#   python benchmarks/startup.py [--budget-ms 1500] [--top 15] [--window]
+# Retourne un code d'erreur si le budget est dépassé ou si un module lourd
+# (matplotlib, scipy, pandas...) est chargé dès le démarrage.
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules qui ne doivent être chargés qu'à la première utilisation (analyse, export)
+DEFERRED_MODULES = ("matplotlib", "scipy", "pandas", "numpy", "pyarrow", "openpyxl", "docx")
+
+IMPORT_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+WINDOW_SNIPPET = """
+import time
+start = time.perf_counter()
+from PyQt6.QtWidgets import QApplication
+import main
+app = QApplication([])
+window = main.ExDForm()
+window.show()
+app.processEvents()
+print(f"{(time.perf_counter() - start) * 1000:.1f}")
+window.close()
+"""
+
+
+def measure_imports(module):
+    """Retourne [(module, propre_us, cumulé_us, profondeur)] pour l'import de module"""
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, env=env, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise SystemExit(result.stderr)
+    entries = []
+    for line in result.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            entries.append((name, int(self_us), int(cumulative_us), len(indent) // 2))
+    return entries
+
+
+def measure_window():
+    """Temps (ms) jusqu'à l'affichage de la fenêtre principale, plateforme Qt hors écran"""
+    env = dict(os.environ, QT_QPA_PLATFORM=os.environ.get("QT_QPA_PLATFORM", "offscreen"))
+    result = subprocess.run([sys.executable, "-c", WINDOW_SNIPPET], cwd=ROOT, env=env,
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        raise SystemExit(result.stderr)
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Budget de démarrage de ExDForm")
+    parser.add_argument("--module", default="main", help="module mesuré (main, core, cli)")
+    parser.add_argument("--budget-ms", type=float, default=1500.0, help="temps d'import maximal")
+    parser.add_argument("--top", type=int, default=15, help="nombre de modules affichés")
+    parser.add_argument("--window", action="store_true", help="mesure aussi la création de la fenêtre")
+    args = parser.parse_args(argv)
+
+    entries = measure_imports(args.module)
+    total_ms = next(cumulative for name, _, cumulative, _ in entries if name == args.module) / 1000
+
+    # Paquets de premier niveau : temps cumulé de leur import
+    packages = {}
+    for name, _, cumulative, _ in entries:
+        top = name.split(".")[0]
+        if name == top:
+            packages[top] = max(packages.get(top, 0), cumulative)
+
+    print(f"Import de '{args.module}' : {total_ms:.1f} ms (budget {args.budget_ms:.0f} ms)")
+    print(f"{'Module':<30}{'cumulé (ms)':>14}")
+    for name, cumulative in sorted(packages.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"{name:<30}{cumulative / 1000:>14.1f}")
+
+    failures = []
+    loaded = sorted({name.split(".")[0] for name, *_ in entries} & set(DEFERRED_MODULES))
+    if loaded:
+        failures.append(f"modules lourds chargés au démarrage : {', '.join(loaded)}")
+    if total_ms > args.budget_ms:
+        failures.append(f"budget dépassé : {total_ms:.1f} ms > {args.budget_ms:.0f} ms")
+
+    if args.window:
+        print(f"Fenêtre principale affichée en {measure_window():.1f} ms")
+
+    for failure in failures:
+        print(f"ÉCHEC : {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,224 @@
+# Benchmarks de toute la chaîne, sur des données synthétiques reproductibles :
+# lecture du tableau de variables, construction du formulaire, enregistrement, export CSV et analyse.
+#   python benchmarks/suite.py [--variables 300] [--records 50000] [--typed] [--only export_csv ...]
+#   python benchmarks/suite.py --save-baseline      # enregistre les mesures comme référence
+# Chaque mesure est comparée à la référence (benchmarks/baseline.json par défaut) ; le script
+# échoue si l'une d'elles se dégrade de plus de --threshold (20 % par défaut).
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from core import (
+    NORMALITY_CACHE_KEY, connect_database, prepare_database, read_variables_from_docx, export_csv_file,
+    generate_analysis_report, invalidate_analysis_cache
+)
+from synthetic import make_variables, write_variables_docx, write_database
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+
+def best_of(repeat, run):
+    """Meilleur temps (s) de run() sur repeat exécutions"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def bench_docx_parse(args, workdir):
+    path = os.path.join(workdir, "variables.docx")
+    write_variables_docx(path, args.variables, merged=True)
+    return {"docx_parse_ms": (best_of(args.repeat, lambda: read_variables_from_docx(path)) * 1000, "lower")}
+
+
+def qt_window(db_path):
+    """Fenêtre principale hors écran, sans boîte de dialogue bloquante, connectée à db_path"""
+    from PyQt6.QtWidgets import QApplication, QMessageBox
+    import main
+
+    QMessageBox.information = staticmethod(lambda *a, **k: None)
+    app = QApplication.instance() or QApplication([])
+    window = main.ExDForm()
+    window.show()
+    window.connect_to_database(db_path)
+    wait_database(app, window)
+    return app, window
+
+
+def wait_database(app, window):
+    while window.db_client.is_busy():
+        app.processEvents()
+    app.processEvents()
+
+
+def bench_generate_form(args, workdir):
+    app, window = qt_window(":memory:")
+    window.variables = make_variables(args.variables)
+
+    def build():
+        window.generate_form()
+        app.processEvents()
+
+    elapsed = best_of(args.repeat, build)
+    window.close()
+    return {"generate_form_ms": (elapsed * 1000, "lower")}
+
+
+def bench_save_data(args, workdir):
+    from form_reset import fill_form
+
+    app, window = qt_window(os.path.join(workdir, "save.db"))
+    window.variables = make_variables(args.variables)
+    window.generate_form()
+    wait_database(app, window)
+    start = time.perf_counter()
+    for i in range(args.saves):
+        fill_form(window, i)
+        window.save_data()
+        wait_database(app, window)
+    elapsed = time.perf_counter() - start
+    window.close()
+    return {"save_data_per_s": (args.saves / elapsed, "higher")}
+
+
+def bench_export_csv(args, workdir):
+    db = connect_database(args.database)
+    mode, variables = prepare_database(db, [])
+    output = os.path.join(workdir, "export.csv")
+    elapsed = best_of(args.repeat, lambda: export_csv_file(db, mode, variables, output))
+    # Mémoire mesurée à part : tracemalloc ralentit l'exécution
+    tracemalloc.start()
+    export_csv_file(db, mode, variables, output)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    db.close()
+    return {"export_csv_ms": (elapsed * 1000, "lower"), "export_csv_peak_mb": (peak / 2 ** 20, "lower")}
+
+
+def bench_analysis(args, workdir):
+    db = connect_database(args.database)
+    mode, variables = prepare_database(db, [])
+
+    def cold_report():
+        # Sans les agrégats ni les tests de normalité conservés dans la base
+        with db:
+            invalidate_analysis_cache(db)
+            db.execute("DELETE FROM meta WHERE key = ?", (NORMALITY_CACHE_KEY,))
+        generate_analysis_report(db, mode, variables, workers=1)
+
+    cold = best_of(args.repeat, cold_report)
+    warm = best_of(args.repeat, lambda: generate_analysis_report(db, mode, variables, workers=1))
+    db.close()
+    return {"analysis_cold_ms": (cold * 1000, "lower"), "analysis_cached_ms": (warm * 1000, "lower")}
+
+
+BENCHMARKS = {
+    "docx_parse": bench_docx_parse,
+    "generate_form": bench_generate_form,
+    "save_data": bench_save_data,
+    "export_csv": bench_export_csv,
+    "analysis": bench_analysis,
+}
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline, threshold):
+    """Affiche les mesures face à la référence ; retourne la liste des mesures dégradées"""
+    regressions = []
+    print(f"{'Mesure':<22}{'valeur':>12}{'référence':>12}{'écart':>9}")
+    for name, (value, better) in results.items():
+        reference = baseline.get(name, {}).get("value")
+        line = f"{name:<22}{value:>12.2f}"
+        if reference:
+            change = (value - reference) / reference
+            worse = change > threshold if better == "lower" else change < -threshold
+            line += f"{reference:>12.2f}{change:>+9.0%}" + ("  RÉGRESSION" if worse else "")
+            if worse:
+                regressions.append(name)
+        print(line)
+    return regressions
+
+
+def main_benchmark(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks ExDForm avec référence et seuil de régression")
+    parser.add_argument("--variables", type=int, default=300, help="variables du tableau synthétique")
+    parser.add_argument("--records", type=int, default=50000, help="enregistrements de la base synthétique")
+    parser.add_argument("--saves", type=int, default=50, help="enregistrements saisis par save_data")
+    parser.add_argument("--typed", action="store_true", help="base synthétique en stockage typé")
+    parser.add_argument("--repeat", type=int, default=3, help="exécutions par mesure (meilleur temps retenu)")
+    parser.add_argument("--only", nargs="+", choices=BENCHMARKS, help="mesures à exécuter")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="fichier de référence (JSON)")
+    parser.add_argument("--save-baseline", action="store_true", help="enregistre les mesures comme référence")
+    parser.add_argument("--threshold", type=float, default=0.2, help="dégradation tolérée (0.2 = 20 %%)")
+    parser.add_argument("--history", help="fichier JSON Lines où ajouter les mesures de cette exécution")
+    args = parser.parse_args(argv)
+
+    config = {"variables": args.variables, "records": args.records, "saves": args.saves, "typed": args.typed}
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        names = args.only or list(BENCHMARKS)
+        if {"export_csv", "analysis"} & set(names):
+            args.database = os.path.join(workdir, "synthetic.db")
+            # 24 variables (3 de chaque type), indépendamment de --variables
+            write_database(args.database, make_variables(24), args.records, typed=args.typed)
+        for name in names:
+            print(f"{name}...", file=sys.stderr)
+            results.update(BENCHMARKS[name](args, workdir))
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            saved = json.load(f)
+        if saved.get("config") == config:
+            baseline = saved["results"]
+        else:
+            print(f"Référence ignorée : mesurée avec {saved.get('config')}", file=sys.stderr)
+    regressions = compare(results, baseline, args.threshold)
+
+    entry = {
+        "date": datetime.datetime.now().isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "machine": f"{platform.machine()} {platform.system()} Python {platform.python_version()}",
+        "config": config,
+        "results": {name: {"value": round(value, 3), "better": better} for name, (value, better) in results.items()},
+    }
+    if args.history:
+        with open(args.history, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+    if args.save_baseline:
+        if args.only and baseline:
+            # Les mesures non exécutées gardent leur référence
+            entry["results"] = dict(baseline, **entry["results"])
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(entry, f, indent=2)
+        print(f"Référence enregistrée dans {args.baseline}")
+        return 0
+    if regressions:
+        print(f"Régression de plus de {args.threshold:.0%} : {', '.join(regressions)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_benchmark())
@@ -0,0 +1,97 @@
+# Générateurs de données synthétiques pour les benchmarks.
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core import Variable, connect_database, prepare_database, save_records
+
+# (type, modalités, taille) dans l'ordre de rotation des variables générées
+VARIABLE_KINDS = [
+    ("NUM_CONTINUE", "", ""),
+    ("NUM_DISCRETE", "", "6"),
+    ("TEXTE", "", "50"),
+    ("BINAIRE", "", ""),
+    ("CATEGORIELLE", "1-A, 2-B, 3-AB, 4-O", ""),
+    ("CATEGORIELLE_MULTIPLE", "1-Acariens, 2-Gluten, 3-Pollen", ""),
+    ("DATE", "", ""),
+    ("TEMPS", "", "8"),
+]
+
+
+def variable_rows(count):
+    """Lignes (nom, description, modalités, type, taille) de count variables de tous les types"""
+    rows = []
+    for i in range(count):
+        type_variable, modalites, taille = VARIABLE_KINDS[i % len(VARIABLE_KINDS)]
+        if type_variable == "CATEGORIELLE_MULTIPLE":
+            # Modalités propres à chaque variable : une colonne 0/1 distincte par modalité
+            modalites = ", ".join(f"{num}-{label}_{i}" for num, label in
+                                  enumerate(["Acariens", "Gluten", "Pollen"], start=1))
+        rows.append((f"var_{i}", f"Variable {i}", modalites, type_variable, taille))
+    return rows
+
+
+def make_variables(count):
+    return [Variable(*row) for row in variable_rows(count)]
+
+
+def write_variables_docx(path, count, merged=False):
+    """Document Word avec un tableau de count variables (format à 5 colonnes).
+
+    Si merged est vrai, les descriptions sont fusionnées verticalement deux à deux
+    (vMerge), comme dans les tableaux mis en forme à la main.
+    """
+    from docx import Document
+
+    document = Document()
+    table = document.add_table(rows=1, cols=5)
+    for cell, title in zip(table.rows[0].cells, ("Nom variable", "Description", "Modalités", "Type", "Taille")):
+        cell.text = title
+    for i, row in enumerate(variable_rows(count)):
+        cells = table.add_row().cells
+        for cell, text in zip(cells, row):
+            cell.text = text
+        if merged:
+            # La cellule de continuation est vide : son texte est celui de la cellule au-dessus
+            continuation = i % 2 == 1
+            cells[1]._tc.vMerge = "continue" if continuation else "restart"
+            if continuation:
+                cells[1].text = ""
+    document.save(path)
+
+
+def make_record(variables, rng):
+    """Un enregistrement au format du formulaire (nombres en texte, codes de modalités en entiers)"""
+    record = {}
+    for var in variables:
+        if var.type_variable == "NUM_CONTINUE":
+            record[var.nom] = f"{rng.gauss(70, 12):.2f}"
+        elif var.type_variable == "NUM_DISCRETE":
+            record[var.nom] = str(rng.randint(0, 99))
+        elif var.type_variable == "TEXTE":
+            record[var.nom] = f"texte {rng.randint(0, 9999)}"
+        elif var.type_variable == "BINAIRE":
+            record[var.nom] = rng.randint(0, 1)
+        elif var.type_variable == "CATEGORIELLE":
+            record[var.nom] = rng.choice(var.modalites)[0]
+        elif var.type_variable == "CATEGORIELLE_MULTIPLE":
+            for _, mod in var.modalites:
+                record[mod] = rng.randint(0, 1)
+        elif var.type_variable == "DATE":
+            record[var.nom] = f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+        elif var.type_variable == "TEMPS":
+            record[var.nom] = f"{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:00"
+    return record
+
+
+def write_database(path, variables, count, typed=False, seed=0, chunk_size=10000):
+    """Base SQLite de count enregistrements synthétiques reproductibles (graine seed)"""
+    rng = random.Random(seed)
+    db = connect_database(path)
+    mode, variables = prepare_database(db, variables, typed_if_empty=typed)
+    for start in range(0, count, chunk_size):
+        save_records(db, mode, variables, (make_record(variables, rng) for _ in range(min(chunk_size, count - start))))
+    db.close()
+    return mode
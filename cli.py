@@ -0,0 +1,275 @@
+# Interface en ligne de commande de ExDForm, utilisable sur un serveur sans affichage.
+# N'importe ni PyQt6 ni matplotlib. Exemples :
+#   python cli.py import  --db etude.db --schema variables.docx --typed
+#   python cli.py load    --db etude.db --input site_a.csv --rejects rejets.csv
+#   python cli.py export  --db etude.db --output donnees.parquet
+#   python cli.py analyze --db etude.db --output rapport.txt
+#   python cli.py search  --db etude.db dupont
+#   python cli.py find    --db etude.db --var date_visite --between 2024-01-01 2024-03-31
+# EXDFORM_TRACE=1 (ou un chemin de fichier) affiche la durée de chaque opération et écrit la trace.
+import argparse
+import os
+import sys
+
+from instrumentation import TRACER, enable_from_environment
+
+from core import (
+    EXPORT_FORMATS, NORMALITY_STRATEGIES, NORMALITY_STRATEGY, connect_database, prepare_database,
+    migrate_to_typed, load_variables, generate_analysis_report, update_analysis_cache, merge_aggregates,
+    descriptive_statistics, schema_signature, search_text, SEARCH_LIMIT, IMPORT_FORMATS, import_file,
+    write_import_errors, typed_columns, get_indexed_variables, find_record_ids, find_record_ids_between,
+    duplicate_values
+)
+
+
+def open_database(args, typed_if_empty=False):
+    """Ouvre la base ; --schema remplace le schéma enregistré, sinon celui de la base est utilisé.
+
+    Retourne (connexion, mode de stockage, variables).
+    """
+    variables = load_variables(args.schema) if args.schema else []
+    db = connect_database(args.db)
+    mode, variables = prepare_database(db, variables, typed_if_empty=typed_if_empty,
+                                       replace_schema=bool(args.schema),
+                                       source=args.schema and os.path.basename(args.schema))
+    return db, mode, variables
+
+
+def open_existing_database(args):
+    if not os.path.exists(args.db):
+        raise SystemExit(f"Base de données introuvable : {args.db}")
+    return open_database(args)
+
+
+def command_import(args):
+    """Crée ou met à jour la base pour le tableau de variables (et la convertit si --typed)"""
+    db, mode, variables = open_database(args, typed_if_empty=args.typed)
+    if args.typed and not variables:
+        raise SystemExit("--typed nécessite un tableau de variables (--schema ou schéma enregistré).")
+
+    if args.typed and mode != "typed":
+        count = migrate_to_typed(db, variables)
+        mode = "typed"
+        print(f"{count} enregistrement(s) convertis en stockage typé")
+    db.close()
+    print(f"{len(variables)} variable(s) importée(s) dans {args.db} (stockage {mode})")
+    return 0
+
+
+def command_load(args):
+    """Importe un fichier de données CSV ou Excel, validé selon le tableau de variables"""
+    db, mode, variables = open_existing_database(args) if not args.schema else open_database(args)
+    if not variables:
+        raise SystemExit("L'import nécessite un tableau de variables (--schema ou schéma enregistré).")
+
+    def report_progress(done):
+        if not args.quiet:
+            print(f"\r{done} ligne(s) lue(s)", end="", file=sys.stderr)
+        return True
+
+    report = import_file(db, mode, variables, args.input, report_progress)
+    db.close()
+    if not args.quiet:
+        print(file=sys.stderr)
+    if report["ignored"]:
+        print(f"Colonnes ignorées : {', '.join(map(str, report['ignored']))}", file=sys.stderr)
+    if report["missing"]:
+        print(f"Colonnes absentes du fichier : {', '.join(report['missing'])}", file=sys.stderr)
+    if args.rejects and report["errors"]:
+        write_import_errors(args.rejects, report["errors"])
+    else:
+        for line, column, value, message in report["errors"][:20]:
+            print(f"ligne {line}, {column} = {value!r} : {message}", file=sys.stderr)
+    print(f"{report['accepted']} enregistrement(s) importé(s), {report['rejected']} ligne(s) rejetée(s)")
+    return 1 if report["rejected"] else 0
+
+
+def command_export(args):
+    extension = os.path.splitext(args.output)[1].lower()
+    if extension not in EXPORT_FORMATS:
+        raise SystemExit(f"Format d'export inconnu '{extension}' (formats : {', '.join(EXPORT_FORMATS)})")
+
+    db, mode, variables = open_existing_database(args)
+
+    def report_progress(done):
+        if not args.quiet:
+            print(f"\r{done} enregistrement(s) exporté(s)", end="", file=sys.stderr)
+        return True
+
+    count = EXPORT_FORMATS[extension](db, mode, variables, args.output, report_progress)
+    db.close()
+    if not args.quiet:
+        print(file=sys.stderr)
+    print(f"{count} enregistrement(s) exporté(s) vers {args.output}")
+    return 0
+
+
+def format_descriptive_stats(stats):
+    keys = ("mean", "std", "min", "q1", "median", "q3", "max", "skewness", "kurtosis")
+    text = f"{'Variable':<20}{'N':>8}{'Manq.':>8}" + "".join(f"{key:>11}" for key in keys) + "\n"
+    for var_name, values in stats.items():
+        text += f"{var_name:<20}{values['n']:>8}{values['missing']:>8}"
+        text += "".join(f"{values[key]:>11.4g}" if key in values else f"{'':>11}" for key in keys) + "\n"
+    return text
+
+
+def command_analyze(args):
+    db, mode, variables = open_existing_database(args)
+    report = generate_analysis_report(db, mode, variables, strategy=args.normality, workers=args.workers)
+    db.close()
+    if "error" in report:
+        print(report["error"], file=sys.stderr)
+        return 1
+
+    text = report["summary"]
+    if report["normality_tests"]:
+        text += "\nTests de Normalité (p-values):\n" + "-" * 40 + "\n"
+        for var_name, tests in report["normality_tests"].items():
+            text += f"{var_name}: {tests['test']} {tests['shapiro_p']:.4f}, Kolmogorov-Smirnov {tests['ks_p']:.4f}\n"
+    if report["frequency_tables"]:
+        text += "\nFréquences des variables catégorielles:\n" + "-" * 40 + "\n"
+        for var_name, table in report["frequency_tables"].items():
+            rows = table["rows"] + ([dict(table["missing"], label="Manquant")] if table["missing"] else [])
+            text += f"{var_name}: " + ", ".join(f"{row['label']} {row['count']} ({row['percentage']:.1f}%)"
+                                                  for row in rows) + "\n"
+    if report["descriptive_stats"]:
+        text += "\nStatistiques descriptives (quantiles approchés):\n" + "-" * 40 + "\n"
+        text += format_descriptive_stats(report["descriptive_stats"])
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+        print(f"Rapport écrit dans {args.output}")
+    else:
+        print(text)
+    return 0
+
+
+def command_stats(args):
+    """Statistiques descriptives d'une base, ou de plusieurs bases de même schéma réunies"""
+    db, mode, variables = open_existing_database(args)
+    aggregates = update_analysis_cache(db, mode, variables)
+    db.close()
+    for path in args.merge or []:
+        other = connect_database(path)
+        other_mode, other_variables = prepare_database(other, variables)
+        if schema_signature(other_variables) != schema_signature(variables):
+            raise SystemExit(f"{path} n'a pas le même tableau de variables que {args.db}")
+        aggregates = merge_aggregates(aggregates, update_analysis_cache(other, other_mode, other_variables))
+        other.close()
+
+    print(f"{aggregates['total']} enregistrement(s)")
+    print(format_descriptive_stats(descriptive_statistics(aggregates, variables)), end="")
+    return 0
+
+
+def command_search(args):
+    """Identifiants des enregistrements dont une variable TEXTE contient les mots recherchés"""
+    db, mode, variables = open_existing_database(args)
+    ids = search_text(db, " ".join(args.words), args.limit)
+    db.close()
+    if ids is None:
+        raise SystemExit("Aucun index plein texte : le tableau de variables ne contient pas de variable TEXTE.")
+    print("\n".join(map(str, ids)))
+    print(f"{len(ids)} enregistrement(s) trouvé(s)", file=sys.stderr)
+    return 0
+
+
+def command_find(args):
+    """Recherche par valeur, par plage ou des doublons d'une variable (rapide si elle est indexée)"""
+    db, mode, variables = open_existing_database(args)
+    if args.var not in dict(typed_columns(variables)):
+        db.close()
+        raise SystemExit(f"Variable inconnue : {args.var}")
+    if args.var not in get_indexed_variables(db):
+        print(f"{args.var} n'est pas indexée : toute la table est lue", file=sys.stderr)
+    if args.duplicates:
+        duplicates = duplicate_values(db, mode, variables, args.var)
+        db.close()
+        for value, count in duplicates:
+            print(f"{value}\t{count}")
+        print(f"{len(duplicates)} valeur(s) en double", file=sys.stderr)
+        return 0
+    if args.between:
+        ids = find_record_ids_between(db, mode, variables, args.var, *args.between)
+    else:
+        ids = find_record_ids(db, mode, variables, args.var, args.value)
+    db.close()
+    print("\n".join(map(str, ids)))
+    print(f"{len(ids)} enregistrement(s) trouvé(s)", file=sys.stderr)
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="exdform", description="ExDForm sans interface graphique")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    def add_command(name, help_text, handler):
+        command = subparsers.add_parser(name, help=help_text)
+        command.add_argument("--db", required=True, help="base SQLite (.db / .sqlite)")
+        command.add_argument("--schema", help="tableau de variables (.docx) ; par défaut celui enregistré dans la base")
+        command.set_defaults(handler=handler)
+        return command
+
+    command = add_command("import", "prépare la base pour un tableau de variables", command_import)
+    command.add_argument("--typed", action="store_true", help="stockage typé (convertit une base JSON existante)")
+
+    command = add_command("load", "importe des données CSV ou Excel validées selon le tableau de variables",
+                          command_load)
+    command.add_argument("--input", required=True, help=f"fichier de données ({', '.join(IMPORT_FORMATS)})")
+    command.add_argument("--rejects", help="rapport CSV des lignes rejetées")
+    command.add_argument("--quiet", action="store_true", help="n'affiche pas la progression")
+
+    command = add_command("export", "exporte les données (CSV, Excel, Parquet, Feather)", command_export)
+    command.add_argument("--output", required=True, help="fichier de sortie ; le format suit l'extension")
+    command.add_argument("--quiet", action="store_true", help="n'affiche pas la progression")
+
+    command = add_command("analyze", "génère le rapport d'analyse exploratoire", command_analyze)
+    command.add_argument("--output", help="fichier texte du rapport (sinon affiché)")
+    command.add_argument("--normality", choices=NORMALITY_STRATEGIES, default=NORMALITY_STRATEGY,
+                         help="test remplaçant Shapiro-Wilk au-delà de 5000 valeurs")
+    command.add_argument("--workers", type=int, help="processus pour les tests de normalité (1 : aucun)")
+
+    command = add_command("stats", "statistiques descriptives en mémoire bornée", command_stats)
+    command.add_argument("--merge", action="append", metavar="DB", help="autre base de même schéma à réunir")
+
+    command = add_command("search", "recherche plein texte dans les variables TEXTE", command_search)
+    command.add_argument("words", nargs="+", help="mots recherchés (préfixes, tous requis)")
+    command.add_argument("--limit", type=int, default=SEARCH_LIMIT, help="nombre maximal de résultats")
+
+    command = add_command("find", "recherche par valeur, par plage ou des doublons d'une variable", command_find)
+    command.add_argument("--var", required=True, help="variable (ou modalité d'une variable à choix multiples)")
+    criteria = command.add_mutually_exclusive_group(required=True)
+    criteria.add_argument("--value", help="valeur exacte")
+    criteria.add_argument("--between", nargs=2, metavar=("MIN", "MAX"), help="plage de valeurs (bornes incluses)")
+    criteria.add_argument("--duplicates", action="store_true", help="valeurs présentes plusieurs fois")
+
+    return parser
+
+
+def format_trace_summary(summary):
+    text = f"{'Opération':<45}{'appels':>8}{'total (ms)':>12}{'lignes':>10}{'pic processus (Mo)':>20}\n"
+    for name, entry in summary.items():
+        rows = entry.get("rows")
+        peak = entry.get("process_peak_mb")
+        text += (f"{name:<45}{entry['calls']:>8}{entry['total_ms']:>12.1f}{'' if rows is None else rows:>10}"
+                 f"{'' if peak is None else f'{peak:.0f}':>20}\n")
+    return text
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    # Trace écrite ici une seule fois, avec son chemin affiché (pas d'écriture à la sortie)
+    if not enable_from_environment(write_at_exit=False):
+        return args.handler(args)
+    status = args.handler(args)
+    print(format_trace_summary(TRACER.summary()), end="", file=sys.stderr)
+    print(f"Trace écrite dans {TRACER.write()}", file=sys.stderr)
+    return status
+
+
+if __name__ == "__main__":
+    # Processus des tests de normalité dans un exécutable figé (PyInstaller, cx_Freeze)
+    import multiprocessing
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -0,0 +1,1774 @@
+# Cœur de ExDForm sans interface graphique : variables, stockage SQLite, exports et analyse.
+# Ce module n'importe ni PyQt6 ni matplotlib : il est utilisable en script et par cli.py.
+# pandas et scipy sont importés dans les fonctions qui les utilisent,
+# pour ne pas ralentir le démarrage de l'application.
+import re
+import json
+import sqlite3
+import csv
+import hashlib
+import importlib
+import math
+import os
+import datetime
+import contextlib
+
+from field_rules import field_rule
+from instrumentation import traced, mark_stage
+
+
+class Variable:
+    # Enregistrement compact : les grands tableaux comptent des milliers de variables
+    __slots__ = ("nom", "description", "modalites", "type_variable", "taille")
+
+    def __init__(self, nom, description, modalites, type_variable, taille=None):
+        self.nom = nom.strip()
+        self.description = description.strip()
+        self.modalites = self.parse_modalites(modalites)
+        self.type_variable = type_variable.strip().upper()
+        self.taille = int(taille) if taille and taille.isdigit() else None
+
+    def parse_modalites(self, modalites):
+        items = re.findall(r'(\d+)\s*[-:]?\s*([^,\n]+)', modalites)
+        return [(int(num.strip()), label.strip()) for num, label in items] if items else []
+
+    def to_dict(self):
+        return {
+            "nom": self.nom,
+            "description": self.description,
+            "modalites": self.modalites,
+            "type_variable": self.type_variable,
+            "taille": self.taille,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Recrée une variable sérialisée par to_dict, sans réanalyser les modalités"""
+        var = cls.__new__(cls)
+        var.nom = data["nom"]
+        var.description = data["description"]
+        var.modalites = [(int(num), label) for num, label in data["modalites"]]
+        var.type_variable = data["type_variable"]
+        var.taille = data["taille"]
+        return var
+
+
+def variables_from_rows(rows):
+    """Variables d'un tableau donné sous forme de lignes de textes de cellules.
+
+    Tableau à 5 colonnes (nouveau format, avec la taille) ou à 4 colonnes (ancien format) ;
+    la première ligne est l'en-tête et les variables de type ID sont ignorées.
+    """
+    rows = iter(rows)
+    header = next(rows, None)
+    if header is None:
+        return []
+    # Vérifier si la table a au moins 5 colonnes (nouveau format)
+    with_size = len(header) >= 5
+    vars = []
+    for cells in rows:
+        if len(cells) < (5 if with_size else 4):
+            continue
+        nom, description, modalites, type_variable = cells[:4]
+        taille = cells[4] if with_size else None
+
+        # Handle multi-line modalities by replacing newlines with commas
+        modalites = modalites.replace('\n', ', ')
+
+        if type_variable.strip().upper() != "ID":
+            vars.append(Variable(nom, description, modalites, type_variable, taille))
+    return vars
+
+
+def read_variables_with_python_docx(file_path):
+    """Lecture des tableaux de variables via python-docx (lente sur les grands tableaux)"""
+    from docx import Document
+
+    doc = Document(file_path)
+    vars = []
+    for table in doc.tables:
+        vars.extend(variables_from_rows([cell.text for cell in row.cells] for row in table.rows))
+    return vars
+
+
+WORD_NAMESPACE = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+OFFICE_DOCUMENT_REL = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"
+
+
+def docx_document_part(archive):
+    """Nom de la partie principale du document dans l'archive .docx"""
+    from xml.etree import ElementTree
+
+    try:
+        rels = ElementTree.fromstring(archive.read("_rels/.rels"))
+    except KeyError:
+        return "word/document.xml"
+    for rel in rels:
+        if rel.get("Type") == OFFICE_DOCUMENT_REL:
+            return rel.get("Target").lstrip("/")
+    return "word/document.xml"
+
+
+def paragraph_text(p):
+    """Texte d'un paragraphe w:p, comme Paragraph.text de python-docx"""
+    w = WORD_NAMESPACE
+    parts = []
+    for child in p:
+        if child.tag == w + "r":
+            runs = [child]
+        elif child.tag == w + "hyperlink":
+            runs = child.findall(w + "r")
+        else:
+            continue
+        for run in runs:
+            for e in run:
+                if e.tag == w + "t":
+                    parts.append(e.text or "")
+                elif e.tag in (w + "tab", w + "ptab"):
+                    parts.append("\t")
+                elif e.tag == w + "cr":
+                    parts.append("\n")
+                elif e.tag == w + "br":
+                    parts.append("\n" if e.get(w + "type", "textWrapping") == "textWrapping" else "")
+                elif e.tag == w + "noBreakHyphen":
+                    parts.append("-")
+    return "".join(parts)
+
+
+def row_cells(tr, above):
+    """Textes des cellules d'une ligne w:tr, comme row.cells de python-docx.
+
+    Une cellule fusionnée horizontalement (gridSpan) est répétée pour chaque colonne couverte ;
+    une cellule de continuation verticale (vMerge) reprend le texte de la cellule au-dessus.
+    above associe la position dans la grille au texte de la ligne précédente.
+    Retourne (cellules, positions de cette ligne).
+    """
+    w = WORD_NAMESPACE
+    offset = 0
+    trPr = tr.find(w + "trPr")
+    if trPr is not None:
+        grid_before = trPr.find(w + "gridBefore")
+        if grid_before is not None:
+            offset = int(grid_before.get(w + "val", 0))
+    cells, current = [], {}
+    for tc in tr.iterfind(w + "tc"):
+        span, merge = 1, None
+        tcPr = tc.find(w + "tcPr")
+        if tcPr is not None:
+            span_element = tcPr.find(w + "gridSpan")
+            if span_element is not None:
+                span = int(span_element.get(w + "val", 1))
+            merge = tcPr.find(w + "vMerge")
+        if merge is not None and merge.get(w + "val", "continue") == "continue":
+            text = above.get(offset, "")
+        else:
+            text = "\n".join(paragraph_text(p) for p in tc.iterfind(w + "p"))
+        cells.extend([text] * span)
+        current[offset] = text
+        offset += span
+    return cells, current
+
+
+def iter_docx_tables(file_path):
+    """Parcourt en flux word/document.xml et produit les lignes de chaque tableau de premier niveau.
+
+    Chaque ligne est libérée dès qu'elle a été lue : le XML du document n'est jamais chargé en entier.
+    Les tableaux imbriqués dans une cellule sont ignorés, comme doc.tables de python-docx.
+    """
+    import zipfile
+    from xml.etree import ElementTree
+
+    w = WORD_NAMESPACE
+    with zipfile.ZipFile(file_path) as archive:
+        with archive.open(docx_document_part(archive)) as document:
+            depth = 0
+            body = rows = None
+            above = {}
+            for event, elem in ElementTree.iterparse(document, events=("start", "end")):
+                if event == "start":
+                    depth += 1
+                    if depth == 2 and elem.tag == w + "body":
+                        body = elem
+                    elif depth == 3 and body is not None and elem.tag == w + "tbl":
+                        rows, above = [], {}
+                    continue
+                depth -= 1
+                if depth == 3 and rows is not None and elem.tag == w + "tr":
+                    cells, above = row_cells(elem, above)
+                    rows.append(cells)
+                    elem.clear()
+                elif depth == 2 and body is not None:
+                    # Enfant direct de w:body terminé : tableau produit, le reste ignoré
+                    if rows is not None:
+                        yield rows
+                        rows = None
+                    body.clear()
+
+
+def read_variables_from_docx(file_path):
+    """Lit les tableaux de variables (4 ou 5 colonnes) d'un document Word"""
+    vars = []
+    for rows in iter_docx_tables(file_path):
+        vars.extend(variables_from_rows(rows))
+    return vars
+
+
+# Cache des tableaux de variables analysés, indexé par le contenu du fichier .docx
+SCHEMA_CACHE_VERSION = 1
+
+
+def schema_cache_dir():
+    if os.environ.get("EXDFORM_CACHE_DIR"):
+        return os.environ["EXDFORM_CACHE_DIR"]
+    base = os.environ.get("LOCALAPPDATA") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "exdform")
+
+
+def file_hash(file_path):
+    digest = hashlib.sha1()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+@traced("Lecture du tableau de variables", rows=len)
+def load_variables(file_path):
+    """Variables d'un fichier .docx, lues depuis le cache si ce contenu a déjà été analysé"""
+    cache_path = os.path.join(schema_cache_dir(), f"{file_hash(file_path)}-v{SCHEMA_CACHE_VERSION}.json")
+    try:
+        with open(cache_path, encoding="utf-8") as f:
+            return [Variable.from_dict(data) for data in json.load(f)]
+    except (OSError, ValueError, KeyError):
+        pass
+
+    variables = read_variables_from_docx(file_path)
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        with open(cache_path, "w", encoding="utf-8") as f:
+            json.dump([var.to_dict() for var in variables], f)
+    except OSError:
+        pass  # Cache facultatif (dossier en lecture seule...)
+    return variables
+
+
+# Tableau de variables enregistré dans la base, avec l'empreinte de son contenu
+def schema_hash(variables):
+    return hashlib.sha1(json.dumps([var.to_dict() for var in variables]).encode("utf-8")).hexdigest()
+
+
+def create_schema_table(db):
+    db.execute("""
+        CREATE TABLE IF NOT EXISTS schema (
+            hash TEXT PRIMARY KEY,
+            variables TEXT NOT NULL,
+            source TEXT,
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+
+def save_schema(db, variables, source=None):
+    """Enregistre le tableau de variables et en fait le schéma courant de la base"""
+    content_hash = schema_hash(variables)
+    db.execute("INSERT OR IGNORE INTO schema (hash, variables, source) VALUES (?, ?, ?)",
+               (content_hash, json.dumps([var.to_dict() for var in variables]), source))
+    set_meta(db, "schema_hash", content_hash)
+    return content_hash
+
+
+def load_schema(db):
+    """Variables du schéma courant de la base ([] si aucun n'a été enregistré)"""
+    row = db.execute("SELECT s.variables FROM meta m JOIN schema s ON s.hash = m.value "
+                     "WHERE m.key = 'schema_hash'").fetchone()
+    return [Variable.from_dict(data) for data in json.loads(row[0])] if row else []
+
+
+# Stockage typé : une colonne SQL par variable au lieu d'un objet JSON par enregistrement
+TYPED_TABLE = "data_typed"
+SQL_TYPES = {
+    "NUM_CONTINUE": "REAL",
+    "NUM_DISCRETE": "INTEGER",
+    "BINAIRE": "INTEGER",
+    "CATEGORIELLE": "INTEGER",
+    "TEXTE": "TEXT",
+    "DATE": "TEXT",   # ISO yyyy-MM-dd
+    "TEMPS": "TEXT",  # ISO hh:mm:ss
+}
+
+
+def quote_identifier(name):
+    """Protège un nom de colonne pour l'utiliser dans une requête SQL"""
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def typed_columns(variables):
+    """Retourne la liste ordonnée (colonne, type SQL) de la table typée"""
+    columns = {}
+    for var in variables:
+        if var.type_variable == "CATEGORIELLE_MULTIPLE":
+            # Une colonne 0/1 par modalité, nommée comme la clé JSON
+            for num, mod in var.modalites:
+                columns.setdefault(mod, "INTEGER")
+        elif var.type_variable in SQL_TYPES:
+            columns.setdefault(var.nom, SQL_TYPES[var.type_variable])
+    return list(columns.items())
+
+
+def to_sql_value(value, sql_type):
+    """Convertit une valeur du formulaire vers le type de sa colonne (None si vide)"""
+    if value is None or value == "":
+        return None
+    try:
+        if sql_type == "REAL":
+            return float(value)
+        if sql_type == "INTEGER":
+            return int(value)
+    except (TypeError, ValueError):
+        # Valeur conservée telle quelle plutôt que perdue
+        return value
+    return value
+
+
+def create_meta_table(db):
+    db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+
+
+def get_meta(db, key, default=None):
+    row = db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+    return row[0] if row else default
+
+
+def set_meta(db, key, value):
+    db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+
+def get_storage_mode(db):
+    """Mode de stockage de la base : 'json' (historique) ou 'typed'"""
+    return get_meta(db, "storage_mode", "json")
+
+
+def create_tables(db):
+    db.execute("""
+        CREATE TABLE IF NOT EXISTS data (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            form_data TEXT
+        )
+    """)
+    create_meta_table(db)
+    create_schema_table(db)
+
+
+def list_tables(db):
+    return {row[0] for row in db.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+
+
+def table_columns(db, table):
+    return [row[1] for row in db.execute(f"PRAGMA table_info({quote_identifier(table)})")]
+
+
+def ensure_typed_table(db, variables, extra_columns=()):
+    """Crée la table typée et ajoute les colonnes manquantes pour le schéma donné"""
+    columns = typed_columns(variables)
+    db.execute(f"CREATE TABLE IF NOT EXISTS {TYPED_TABLE} (id INTEGER PRIMARY KEY AUTOINCREMENT)")
+    existing = set(table_columns(db, TYPED_TABLE))
+    # Les colonnes hors schéma (anciennes variables) sont créées sans type
+    for name, sql_type in columns + [(name, "") for name in extra_columns]:
+        if name not in existing:
+            db.execute(f"ALTER TABLE {TYPED_TABLE} ADD COLUMN {quote_identifier(name)} {sql_type}".rstrip())
+            existing.add(name)
+    return columns
+
+
+def typed_row(columns, data):
+    return tuple(to_sql_value(data.get(name), sql_type) for name, sql_type in columns)
+
+
+def typed_insert_sql(columns, with_id=False):
+    names = (["id"] if with_id else []) + [name for name, _ in columns]
+    placeholders = ", ".join("?" * len(names))
+    return (f"INSERT INTO {TYPED_TABLE} ({', '.join(quote_identifier(n) for n in names)}) "
+            f"VALUES ({placeholders})")
+
+
+@traced("Conversion en stockage typé")
+def migrate_to_typed(db, variables):
+    """Convertit une base JSON en stockage typé, dans une seule transaction.
+
+    Les clés JSON absentes du schéma sont conservées dans des colonnes sans type.
+    Retourne le nombre d'enregistrements migrés.
+    """
+    keys = [row[0] for row in db.execute(
+        "SELECT DISTINCT j.key FROM data, json_each(data.form_data) AS j")]
+    known = {name for name, _ in typed_columns(variables)}
+    extra = [key for key in keys if key not in known and key != "id"]
+    with db:
+        columns = ensure_typed_table(db, variables, extra) + [(name, "") for name in extra]
+
+        rows = (
+            (row_id,) + typed_row(columns, json.loads(form_data))
+            for row_id, form_data in db.cursor().execute("SELECT id, form_data FROM data")
+        )
+        cursor = db.executemany(typed_insert_sql(columns, with_id=True), rows)
+        # Index plein texte reconstruit sur la table typée avant de vider la table JSON
+        create_text_index(db, "typed", variables)
+        db.execute("DELETE FROM data")
+        set_meta(db, "storage_mode", "typed")
+        invalidate_analysis_cache(db)
+        create_field_indexes(db, "typed", variables, get_indexed_variables(db))
+    return cursor.rowcount
+
+
+# Écriture : connexion réglée pour les saisies en volume et insertions groupées
+SAVE_BATCH_SIZE = 50
+SAVE_FLUSH_INTERVAL_MS = 30000
+
+
+def connect_database(path):
+    """Ouvre une connexion SQLite en mode WAL (un fsync par point de contrôle, pas par enregistrement)"""
+    db = sqlite3.connect(path, cached_statements=256)
+    db.execute("PRAGMA journal_mode=WAL")
+    db.execute("PRAGMA synchronous=NORMAL")
+    db.execute("PRAGMA busy_timeout=5000")
+    return db
+
+
+def insert_statement(mode, variables):
+    """Requête d'insertion et fonction de conversion d'un enregistrement pour le mode de stockage.
+
+    La requête est identique d'un appel à l'autre et réutilise donc l'instruction préparée
+    gardée en cache par sqlite3.
+    """
+    if mode == "typed":
+        columns = typed_columns(variables)
+        return typed_insert_sql(columns), lambda data: typed_row(columns, data)
+    return "INSERT INTO data (form_data) VALUES (?)", lambda data: (json.dumps(data),)
+
+
+@traced("Enregistrement")
+def save_records(db, mode, variables, records):
+    """Insère un itérable d'enregistrements (dictionnaires) en une seule transaction.
+
+    Retourne le nombre d'enregistrements insérés.
+    """
+    sql, to_row = insert_statement(mode, variables)
+    with db:
+        cursor = db.executemany(sql, (to_row(data) for data in records))
+    return cursor.rowcount
+
+
+class RecordWriter:
+    """File d'enregistrements transmis par lots de batch_size à write(liste_d_enregistrements).
+
+    Pour une écriture directe : RecordWriter(lambda records: save_records(db, mode, variables, records))
+    """
+
+    def __init__(self, write, batch_size=SAVE_BATCH_SIZE):
+        self.write = write
+        self.batch_size = batch_size
+        self.pending = []
+
+    def add(self, data):
+        """Ajoute un enregistrement ; retourne True si le lot a été écrit"""
+        self.pending.append(data)
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+            return True
+        return False
+
+    def flush(self):
+        """Écrit les enregistrements en attente ; retourne leur nombre"""
+        if not self.pending:
+            return 0
+        records, self.pending = self.pending, []
+        try:
+            self.write(records)
+        except Exception:
+            self.pending[:0] = records
+            raise
+        return len(records)
+
+
+# Index sur les variables déclarées "indexées" (json_extract en mode JSON, colonne en mode typé)
+INDEX_PREFIX = "idx_field_"
+
+
+def data_table(mode):
+    return TYPED_TABLE if mode == "typed" else "data"
+
+
+def field_expression(mode, key, row=None):
+    """Expression SQL d'une variable ; identique dans l'index et les requêtes pour que SQLite l'utilise.
+
+    row préfixe la colonne (ex. "new" dans un déclencheur).
+    """
+    prefix = row + "." if row else ""
+    if mode == "typed":
+        return prefix + quote_identifier(key)
+    path = '$."' + key + '"'
+    return "json_extract(" + prefix + "form_data, '" + path.replace("'", "''") + "')"
+
+
+def get_indexed_variables(db):
+    return json.loads(get_meta(db, "indexed_variables", "[]"))
+
+
+def lookup_expression(mode, variables, key):
+    """Expression d'une variable dans les index et les recherches par valeur.
+
+    En mode JSON, les nombres sont enregistrés en texte par le formulaire : l'expression les
+    convertit (une valeur vide devient NULL) pour que 9 < 10 et que 53 retrouve "53".
+    """
+    expression = field_expression(mode, key)
+    sql_type = dict(typed_columns(variables)).get(key)
+    if mode == "typed" or sql_type not in ("REAL", "INTEGER"):
+        return expression
+    return f"CAST(NULLIF({expression}, '') AS {sql_type})"
+
+
+def lookup_value(variables, key, value):
+    """Valeur recherchée convertie vers le type de la variable"""
+    return to_sql_value(value, dict(typed_columns(variables)).get(key, ""))
+
+
+def set_indexed_variables(db, mode, variables, keys):
+    """Enregistre la liste des variables indexées et met les index à jour"""
+    with db:
+        set_meta(db, "indexed_variables", json.dumps(list(keys)))
+        create_field_indexes(db, mode, variables, keys)
+
+
+def create_field_indexes(db, mode, variables, keys):
+    """Crée les index des variables indexées et supprime ceux qui ne le sont plus ou plus à jour"""
+    table = data_table(mode)
+    wanted = {}
+    if table in list_tables(db):
+        for key in keys:
+            if mode == "typed" and key not in table_columns(db, table):
+                continue
+            name = INDEX_PREFIX + key
+            wanted[name] = (f"CREATE INDEX {quote_identifier(name)} "
+                            f"ON {table} ({lookup_expression(mode, variables, key)})")
+    existing = dict(db.execute(
+        "SELECT name, sql FROM sqlite_master WHERE type = 'index' AND name GLOB ?", (INDEX_PREFIX + "*",)))
+    for name, sql in existing.items():
+        if wanted.get(name) != sql:
+            db.execute(f"DROP INDEX {quote_identifier(name)}")
+    for name, sql in wanted.items():
+        if existing.get(name) != sql:
+            db.execute(sql)
+
+
+def find_record_ids(db, mode, variables, key, value):
+    """Identifiants des enregistrements dont la variable vaut exactement value"""
+    sql = f"SELECT id FROM {data_table(mode)} WHERE {lookup_expression(mode, variables, key)} = ? ORDER BY id"
+    return [row[0] for row in db.execute(sql, (lookup_value(variables, key, value),))]
+
+
+def find_record_ids_between(db, mode, variables, key, low, high):
+    """Identifiants des enregistrements dont la variable est comprise entre low et high (inclus)"""
+    expr = lookup_expression(mode, variables, key)
+    sql = f"SELECT id FROM {data_table(mode)} WHERE {expr} BETWEEN ? AND ? ORDER BY {expr}, id"
+    bounds = (lookup_value(variables, key, low), lookup_value(variables, key, high))
+    return [row[0] for row in db.execute(sql, bounds)]
+
+
+def duplicate_values(db, mode, variables, key):
+    """Valeurs présentes plusieurs fois pour une variable : liste de (valeur, nombre)"""
+    expr = lookup_expression(mode, variables, key)
+    sql = (f"SELECT {expr} AS value, COUNT(*) FROM {data_table(mode)} "
+           f"WHERE value IS NOT NULL AND value != '' GROUP BY {expr} HAVING COUNT(*) > 1 ORDER BY 2 DESC, 1")
+    return db.execute(sql).fetchall()
+
+
+TEXT_INDEX_TABLE = "data_fts"
+TEXT_TRIGGERS = ("data_fts_insert", "data_fts_update", "data_fts_delete")
+SEARCH_LIMIT = 1000
+
+
+def text_columns(variables):
+    """Variables TEXTE du tableau, sans doublon, dans l'ordre du tableau"""
+    return list(dict.fromkeys(var.nom for var in variables if var.type_variable == "TEXTE"))
+
+
+def fts5_available(db):
+    """Vrai si le SQLite de Python est compilé avec FTS5"""
+    try:
+        db.execute("CREATE VIRTUAL TABLE IF NOT EXISTS temp.fts5_probe USING fts5(x)")
+        db.execute("DROP TABLE temp.fts5_probe")
+    except sqlite3.OperationalError:
+        return False
+    return True
+
+
+def drop_text_index(db):
+    for trigger in TEXT_TRIGGERS:
+        db.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    db.execute(f"DROP TABLE IF EXISTS {TEXT_INDEX_TABLE}")
+
+
+def create_text_index(db, mode, variables):
+    """Crée (ou reconstruit si le schéma ou le mode a changé) l'index plein texte des variables TEXTE.
+
+    L'index a pour rowid l'identifiant de l'enregistrement ; des déclencheurs sur la table de
+    données le tiennent à jour à chaque insertion, modification et suppression.
+    Retourne False si aucune variable TEXTE n'est à indexer ou si FTS5 est indisponible.
+    """
+    columns = text_columns(variables)
+    signature = json.dumps([mode, columns])
+    if columns and get_meta(db, "text_index") == signature and TEXT_INDEX_TABLE in list_tables(db):
+        return True
+    drop_text_index(db)
+    set_meta(db, "text_index", "")
+    if not columns or not fts5_available(db):
+        return False
+
+    names = ", ".join(quote_identifier(name) for name in columns)
+    # remove_diacritics : "Helene" trouve "Hélène"
+    db.execute(f"CREATE VIRTUAL TABLE {TEXT_INDEX_TABLE} USING fts5({names}, "
+               f"tokenize = 'unicode61 remove_diacritics 2')")
+    index_text_rows(db, mode, columns)
+    create_text_triggers(db, mode, columns)
+    set_meta(db, "text_index", signature)
+    return True
+
+
+def index_text_rows(db, mode, columns, after_id=0):
+    """Ajoute à l'index, en une requête, les enregistrements d'identifiant supérieur à after_id"""
+    names = ", ".join(quote_identifier(name) for name in columns)
+    db.execute(f"INSERT INTO {TEXT_INDEX_TABLE} (rowid, {names}) "
+               f"SELECT id, {', '.join(field_expression(mode, name) for name in columns)} "
+               f"FROM {data_table(mode)} WHERE id > ?", (after_id,))
+
+
+def create_text_triggers(db, mode, columns):
+    table = data_table(mode)
+    names = ", ".join(quote_identifier(name) for name in columns)
+    new_values = ", ".join(field_expression(mode, name, "new") for name in columns)
+    insert = f"INSERT INTO {TEXT_INDEX_TABLE} (rowid, {names}) VALUES (new.id, {new_values});"
+    delete = f"DELETE FROM {TEXT_INDEX_TABLE} WHERE rowid = old.id;"
+    db.execute(f"CREATE TRIGGER data_fts_insert AFTER INSERT ON {table} BEGIN {insert} END")
+    db.execute(f"CREATE TRIGGER data_fts_update AFTER UPDATE ON {table} BEGIN {delete} {insert} END")
+    db.execute(f"CREATE TRIGGER data_fts_delete AFTER DELETE ON {table} BEGIN {delete} END")
+
+
+@contextlib.contextmanager
+def text_index_deferred(db):
+    """Insertions en masse : déclencheurs plein texte suspendus, nouvelles lignes indexées en une requête à la fin.
+
+    L'index est marqué absent pendant l'opération : s'il n'est pas rétabli (arrêt brutal),
+    prepare_database le reconstruit à la prochaine ouverture.
+    """
+    signature = get_meta(db, "text_index")
+    if not signature:
+        yield
+        return
+    mode, columns = json.loads(signature)
+    last_id = db.execute(f"SELECT COALESCE(MAX(id), 0) FROM {data_table(mode)}").fetchone()[0]
+    with db:
+        for trigger in TEXT_TRIGGERS:
+            db.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        set_meta(db, "text_index", "")
+    try:
+        yield
+    finally:
+        with db:
+            index_text_rows(db, mode, columns, last_id)
+            create_text_triggers(db, mode, columns)
+            set_meta(db, "text_index", signature)
+
+
+def fts_query(text):
+    """Requête FTS5 sûre : chaque mot saisi est un préfixe recherché, tous les mots sont requis"""
+    words = re.findall(r"\w+", text)
+    return " ".join('"' + word + '"*' for word in words)
+
+
+def search_text(db, text, limit=SEARCH_LIMIT):
+    """Identifiants des enregistrements dont une variable TEXTE contient tous les mots de text.
+
+    Retourne None si la base n'a pas d'index plein texte.
+    """
+    if not get_meta(db, "text_index") or TEXT_INDEX_TABLE not in list_tables(db):
+        return None
+    query = fts_query(text)
+    if not query:
+        return []
+    sql = f"SELECT rowid FROM {TEXT_INDEX_TABLE} WHERE {TEXT_INDEX_TABLE} MATCH ? ORDER BY rowid LIMIT ?"
+    return [row[0] for row in db.execute(sql, (query, limit))]
+
+
+@traced("Ouverture de la base")
+def prepare_database(db, variables, typed_if_empty=False, replace_schema=False, source=None):
+    """Crée les tables, fixe le schéma, aligne le stockage typé et crée les index.
+
+    Le schéma enregistré dans la base est utilisé s'il existe ; sinon, ou si replace_schema
+    est vrai, variables devient le schéma de la base. Si typed_if_empty est vrai, une base
+    encore vide passe en stockage typé. Retourne (mode de stockage, variables).
+    """
+    with db:
+        create_tables(db)
+        stored = [] if replace_schema else load_schema(db)
+        if stored:
+            variables = stored
+        elif variables:
+            save_schema(db, variables, source)
+        if typed_if_empty and variables and db.execute("SELECT 1 FROM data LIMIT 1").fetchone() is None:
+            set_meta(db, "storage_mode", "typed")
+        mode = get_storage_mode(db)
+        if mode == "typed":
+            ensure_typed_table(db, variables)
+        create_field_indexes(db, mode, variables, get_indexed_variables(db))
+        create_text_index(db, mode, variables)
+    return mode, variables
+
+
+def clear_records(db):
+    """Supprime tous les enregistrements de la base"""
+    with db:
+        db.execute("DELETE FROM data")
+        if TYPED_TABLE in list_tables(db):
+            db.execute(f"DELETE FROM {TYPED_TABLE}")
+        invalidate_analysis_cache(db)
+
+
+# Consultation et correction des enregistrements, page par page
+BROWSER_PAGE_SIZE = 200
+
+
+def browser_columns(db, mode, variables):
+    """Colonnes affichées : celles du schéma, plus les colonnes sans type de la table typée"""
+    columns = [name for name, _ in typed_columns(variables)]
+    if mode == "typed":
+        columns += [name for name in table_columns(db, TYPED_TABLE) if name != "id" and name not in columns]
+    return columns
+
+
+def fetch_record_page(db, mode, after_id=0, limit=BROWSER_PAGE_SIZE):
+    """Enregistrements d'identifiant supérieur à after_id, au plus limit.
+
+    Pagination par clé (WHERE id > ?) : le coût d'une page ne dépend pas de sa position.
+    Retourne [(id, contenu)] ; en mode JSON le contenu reste le texte form_data, à décoder
+    avec decode_record seulement pour les lignes affichées.
+    """
+    if mode == "typed":
+        cursor = db.execute(f"SELECT * FROM {TYPED_TABLE} WHERE id > ? ORDER BY id LIMIT ?", (after_id, limit))
+        names = [col[0] for col in cursor.description]
+        return [(row[0], dict(zip(names[1:], row[1:]))) for row in cursor]
+    return db.execute("SELECT id, form_data FROM data WHERE id > ? ORDER BY id LIMIT ?", (after_id, limit)).fetchall()
+
+
+def fetch_records_by_id(db, mode, ids):
+    """Enregistrements d'identifiants ids (une page de résultats de recherche), dans l'ordre de ids"""
+    placeholders = ", ".join("?" * len(ids))
+    if mode == "typed":
+        cursor = db.execute(f"SELECT * FROM {TYPED_TABLE} WHERE id IN ({placeholders})", ids)
+        names = [col[0] for col in cursor.description]
+        found = {row[0]: dict(zip(names[1:], row[1:])) for row in cursor}
+    else:
+        found = dict(db.execute(f"SELECT id, form_data FROM data WHERE id IN ({placeholders})", ids))
+    return [(record_id, found[record_id]) for record_id in ids if record_id in found]
+
+
+def decode_record(content):
+    return json.loads(content) if isinstance(content, str) else content
+
+
+def update_record(db, mode, variables, record_id, key, value):
+    """Modifie une valeur d'un enregistrement, convertie comme à l'enregistrement du formulaire.
+
+    value None retire la clé (mode JSON) ou vide la colonne (mode typé). Les agrégats de
+    l'analyse sont invalidés. Retourne le nouveau contenu de l'enregistrement.
+    """
+    with db:
+        if mode == "typed":
+            sql_type = dict(typed_columns(variables)).get(key, "")
+            db.execute(f"UPDATE {TYPED_TABLE} SET {quote_identifier(key)} = ? WHERE id = ?",
+                       (to_sql_value(value, sql_type), record_id))
+        else:
+            row = db.execute("SELECT form_data FROM data WHERE id = ?", (record_id,)).fetchone()
+            if row is None:
+                raise ValueError(f"Enregistrement {record_id} introuvable")
+            data = json.loads(row[0])
+            if value is None:
+                data.pop(key, None)
+            else:
+                data[key] = value
+            db.execute("UPDATE data SET form_data = ? WHERE id = ?", (json.dumps(data), record_id))
+        invalidate_analysis_cache(db)
+    page = fetch_record_page(db, mode, record_id - 1, 1)
+    return page[0][1] if page else None
+
+
+# Export par blocs : la mémoire utilisée ne dépend pas de la taille de la base
+EXPORT_CHUNK_SIZE = 5000
+
+
+def count_records(db, mode):
+    return db.execute(f"SELECT COUNT(*) FROM {data_table(mode)}").fetchone()[0]
+
+
+def export_header(db, mode, variables):
+    """Colonnes de l'export : id, variables dans l'ordre du tableau, puis les autres clés triées"""
+    if mode == "typed":
+        return table_columns(db, TYPED_TABLE)
+    # Les clés présentes sont listées par SQLite, sans décoder les enregistrements en Python
+    keys = {row[0] for row in db.execute("SELECT DISTINCT j.key FROM data, json_each(data.form_data) AS j")}
+    ordered_keys = ["id"] + [name for name, _ in typed_columns(variables) if name in keys]
+    ordered_keys.extend(sorted(key for key in keys if key not in ordered_keys))
+    return ordered_keys
+
+
+def iter_export_chunks(db, mode, header, chunk_size=EXPORT_CHUNK_SIZE):
+    """Génère les lignes de l'export par blocs de chunk_size, dans l'ordre de header"""
+    cursor = db.cursor()
+    if mode == "typed":
+        cursor.execute(f"SELECT {', '.join(quote_identifier(name) for name in header)} FROM {TYPED_TABLE}")
+        while rows := cursor.fetchmany(chunk_size):
+            yield rows
+        return
+
+    keys = header[1:]
+    cursor.execute("SELECT id, form_data FROM data")
+    while rows := cursor.fetchmany(chunk_size):
+        chunk = []
+        for row_id, form_data in rows:
+            record = json.loads(form_data)
+            chunk.append([row_id] + [record.get(key, "") for key in keys])
+        yield chunk
+
+
+@traced("Export CSV")
+def export_csv_file(db, mode, variables, file_path, progress=None, chunk_size=EXPORT_CHUNK_SIZE):
+    """Écrit la base au format CSV au fil de la lecture.
+
+    progress(nombre_exporté) est appelé après chaque bloc ; s'il renvoie False l'export
+    s'arrête, le fichier partiel est supprimé et la fonction renvoie None. Sinon renvoie
+    le nombre de lignes écrites.
+    """
+    header = export_header(db, mode, variables)
+    done = 0
+    with open(file_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        for chunk in iter_export_chunks(db, mode, header, chunk_size):
+            # csv.writer écrit None comme une cellule vide
+            writer.writerows(chunk)
+            done += len(chunk)
+            if progress and progress(done) is False:
+                break
+        else:
+            return done
+    os.remove(file_path)
+    return None
+
+
+# Exports en colonnes typées (Excel, Parquet, Feather), construits bloc par bloc
+EXCEL_MAX_ROWS = 1048575
+EXPORT_KINDS = {"REAL": "float", "INTEGER": "integer"}
+
+
+def require_module(name, feature):
+    """Importe une dépendance optionnelle ou explique comment l'installer"""
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        raise RuntimeError(f"{feature} nécessite le paquet Python '{name}' (pip install {name.split('.')[0]}).")
+
+
+def export_column_kinds(variables):
+    """Type de chaque colonne exportée : float, integer, date ou text (par défaut)"""
+    dates = {var.nom for var in variables if var.type_variable == "DATE"}
+    kinds = {"id": "integer"}
+    for name, sql_type in typed_columns(variables):
+        kinds[name] = "date" if name in dates else EXPORT_KINDS.get(sql_type, "text")
+    return kinds
+
+
+def typed_frame(rows, header, kinds):
+    """Convertit un bloc de lignes en DataFrame aux types du schéma, colonne par colonne.
+
+    Les modalités des variables à choix multiples sont déjà une colonne 0/1 chacune :
+    elles sont converties en entiers nullables comme les autres colonnes entières.
+    """
+    import pandas as pd
+
+    df = pd.DataFrame.from_records(rows, columns=header)
+    for name in header:
+        kind = kinds.get(name, "text")
+        if kind == "float":
+            df[name] = pd.to_numeric(df[name], errors="coerce").astype("float64")
+        elif kind == "integer":
+            values = pd.to_numeric(df[name], errors="coerce")
+            df[name] = values.where(values == values.round()).astype("Int64")
+        elif kind == "date":
+            df[name] = pd.to_datetime(df[name], format="%Y-%m-%d", errors="coerce")
+        else:
+            df[name] = df[name].astype("string").replace("", pd.NA)
+    return df
+
+
+def iter_export_frames(db, mode, header, kinds, chunk_size=EXPORT_CHUNK_SIZE):
+    for chunk in iter_export_chunks(db, mode, header, chunk_size):
+        yield typed_frame(chunk, header, kinds)
+
+
+def arrow_schema(pa, header, kinds):
+    types = {"float": pa.float64(), "integer": pa.int64(), "date": pa.date32()}
+    return pa.schema([(name, types.get(kinds.get(name), pa.string())) for name in header])
+
+
+@traced("Export Parquet")
+def export_parquet_file(db, mode, variables, file_path, progress=None, chunk_size=EXPORT_CHUNK_SIZE):
+    """Écrit la base au format Parquet, un groupe de lignes par bloc (voir export_csv_file)"""
+    pa = require_module("pyarrow", "L'export Parquet")
+    pq = require_module("pyarrow.parquet", "L'export Parquet")
+    header = export_header(db, mode, variables)
+    kinds = export_column_kinds(variables)
+    schema = arrow_schema(pa, header, kinds)
+    done = 0
+    with pq.ParquetWriter(file_path, schema) as writer:
+        for frame in iter_export_frames(db, mode, header, kinds, chunk_size):
+            writer.write_table(pa.Table.from_pandas(frame, schema=schema, preserve_index=False))
+            done += len(frame)
+            if progress and progress(done) is False:
+                break
+        else:
+            return done
+    os.remove(file_path)
+    return None
+
+
+@traced("Export Feather")
+def export_feather_file(db, mode, variables, file_path, progress=None, chunk_size=EXPORT_CHUNK_SIZE):
+    """Écrit la base au format Feather (fichier Arrow IPC), un lot par bloc (voir export_csv_file)"""
+    pa = require_module("pyarrow", "L'export Feather")
+    header = export_header(db, mode, variables)
+    kinds = export_column_kinds(variables)
+    schema = arrow_schema(pa, header, kinds)
+    options = pa.ipc.IpcWriteOptions(compression="lz4")
+    done = 0
+    with pa.OSFile(file_path, "wb") as sink, pa.ipc.new_file(sink, schema, options=options) as writer:
+        for frame in iter_export_frames(db, mode, header, kinds, chunk_size):
+            writer.write_table(pa.Table.from_pandas(frame, schema=schema, preserve_index=False))
+            done += len(frame)
+            if progress and progress(done) is False:
+                break
+        else:
+            return done
+    os.remove(file_path)
+    return None
+
+
+@traced("Export Excel")
+def export_excel_file(db, mode, variables, file_path, progress=None, chunk_size=EXPORT_CHUNK_SIZE):
+    """Écrit la base au format Excel en mode écriture seule (voir export_csv_file)"""
+    openpyxl = require_module("openpyxl", "L'export Excel")
+    if count_records(db, mode) > EXCEL_MAX_ROWS:
+        raise RuntimeError(f"Excel est limité à {EXCEL_MAX_ROWS} lignes : utilisez CSV ou Parquet.")
+
+    header = export_header(db, mode, variables)
+    kinds = export_column_kinds(variables)
+    dates = [name for name in header if kinds.get(name) == "date"]
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet("Données")
+    sheet.append(header)
+    done = 0
+    for frame in iter_export_frames(db, mode, header, kinds, chunk_size):
+        for name in dates:
+            frame[name] = frame[name].dt.date
+        frame = frame.astype(object).where(frame.notna(), None)
+        for row in frame.itertuples(index=False, name=None):
+            sheet.append(row)
+        done += len(frame)
+        if progress and progress(done) is False:
+            # Annulation : aucun fichier n'est écrit ; la feuille en cours (fichier temporaire) est fermée
+            sheet.close()
+            workbook.close()
+            return None
+    workbook.save(file_path)
+    return done
+
+
+# Format d'export selon l'extension du fichier choisi
+EXPORT_FORMATS = {
+    ".csv": export_csv_file,
+    ".xlsx": export_excel_file,
+    ".parquet": export_parquet_file,
+    ".feather": export_feather_file,
+}
+
+
+
+# Import en masse de fichiers CSV / Excel, validé selon le tableau de variables
+IMPORT_CHUNK_SIZE = 5000
+IMPORT_FORMATS = (".csv", ".xlsx")
+# Erreurs détaillées conservées au plus (les lignes rejetées restent toutes comptées)
+IMPORT_MAX_ERRORS = 10000
+
+
+def cell_text(value):
+    """Texte d'une cellule Excel, au format de saisie du formulaire"""
+    if value is None:
+        return ""
+    if isinstance(value, datetime.datetime):
+        return value.time().isoformat() if value.date() == datetime.date(1899, 12, 30) else value.date().isoformat()
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def read_import_chunks(file_path, chunk_size=IMPORT_CHUNK_SIZE):
+    """Lit un CSV ou un classeur Excel par blocs de chunk_size lignes (DataFrame de textes)"""
+    import pandas as pd
+
+    extension = os.path.splitext(file_path)[1].lower()
+    if extension == ".xlsx":
+        openpyxl = require_module("openpyxl", "L'import Excel")
+        workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+        try:
+            rows = workbook.active.iter_rows(values_only=True)
+            header = [cell_text(value) for value in next(rows, ())]
+            chunk = []
+            for row in rows:
+                chunk.append([cell_text(value) for value in row])
+                if len(chunk) == chunk_size:
+                    yield pd.DataFrame(chunk, columns=header)
+                    chunk = []
+            if chunk:
+                yield pd.DataFrame(chunk, columns=header)
+        finally:
+            workbook.close()
+        return
+    if extension != ".csv":
+        raise ValueError(f"Format d'import inconnu '{extension}' (formats : {', '.join(IMPORT_FORMATS)})")
+
+    # Séparateur deviné sur le début du fichier (virgule, point-virgule ou tabulation)
+    with open(file_path, newline="", encoding="utf-8-sig") as f:
+        sample = f.read(65536)
+    try:
+        separator = csv.Sniffer().sniff(sample, delimiters=",;\t").delimiter
+    except csv.Error:
+        separator = ","
+    yield from pd.read_csv(file_path, sep=separator, dtype=str, keep_default_na=False,
+                           encoding="utf-8-sig", chunksize=chunk_size)
+
+
+def import_column_map(header, variables):
+    """Associe les colonnes du fichier aux colonnes du schéma (sans tenir compte de la casse).
+
+    Retourne ({colonne du fichier: (clé, variable)}, colonnes ignorées, colonnes du schéma absentes).
+    """
+    index = column_index(variables)
+    # Colonnes enregistrées : une par variable, une par modalité des variables à choix multiples
+    keys = {}
+    for name, var in index.items():
+        if name != var.nom or var.type_variable != "CATEGORIELLE_MULTIPLE":
+            keys.setdefault(name.strip().lower(), name)
+    mapping, ignored = {}, []
+    for column in header:
+        key = keys.get(str(column).strip().lower())
+        if key is not None and key not in (k for k, _ in mapping.values()):
+            mapping[column] = (key, index[key])
+        elif str(column).strip().lower() != "id":
+            ignored.append(column)
+    found = {key for key, _ in mapping.values()}
+    missing = [name for name in keys.values() if name not in found]
+    return mapping, ignored, missing
+
+
+def map_values(values, lookup, missing):
+    """Remplace chaque valeur par lookup[valeur] (missing si absente), en gardant les entiers"""
+    import pandas as pd
+
+    return pd.Series([lookup.get(value, missing) for value in values.tolist()], index=values.index, dtype=object)
+
+
+def validate_import_column(values, var):
+    """Vérifie une colonne entière avec les règles du formulaire (field_rules), une fois par valeur distincte.
+
+    Retourne (valeurs converties, messages : None pour une valeur valide). Une valeur
+    convertie None signifie que la clé n'est pas enregistrée (modalité laissée vide).
+    """
+    rule = field_rule(var.type_variable)
+    converted, messages = {}, {}
+    for value in values.unique().tolist():
+        try:
+            converted[value] = rule.convert(var, value)
+        except ValueError as e:
+            messages[value] = str(e)
+    return map_values(values, converted, None), map_values(values, messages, None)
+
+
+def validate_import_frame(frame, mapping, first_line):
+    """Valide un bloc du fichier, colonne par colonne.
+
+    Retourne (enregistrements acceptés, erreurs [(ligne, colonne, valeur, message)], lignes vides) ;
+    une ligne est rejetée entière dès qu'une de ses valeurs est invalide, une ligne vide est ignorée.
+    first_line est le numéro, dans le fichier, de la première ligne du bloc.
+    """
+    import numpy as np
+
+    rejected = np.zeros(len(frame), dtype=bool)
+    blank = np.ones(len(frame), dtype=bool)
+    keys, columns, errors = [], [], []
+    for column, (key, var) in mapping.items():
+        values = frame[column].fillna("").astype(str).str.strip()
+        converted, messages = validate_import_column(values, var)
+        blank &= (values == "").to_numpy()
+        invalid = messages.notna().to_numpy()
+        for position in invalid.nonzero()[0]:
+            errors.append((first_line + int(position), column, values.iat[position], messages.iat[position]))
+        rejected |= invalid
+        keys.append(key)
+        columns.append(converted.tolist())
+    records = [
+        {key: value for key, value in zip(keys, row) if value is not None}
+        for row, skip in zip(zip(*columns), rejected | blank) if not skip
+    ]
+    errors.sort(key=lambda error: error[0])
+    return records, errors, int(blank.sum())
+
+
+@traced("Import de données", rows=lambda report: report["accepted"])
+def import_file(db, mode, variables, file_path, progress=None, chunk_size=IMPORT_CHUNK_SIZE):
+    """Importe un fichier CSV ou Excel : validation par blocs, puis une transaction par bloc.
+
+    progress(lignes lues) est appelé après chaque bloc ; s'il renvoie False l'import s'arrête
+    (les blocs déjà écrits sont conservés). Retourne un rapport : accepted, rejected, empty (lignes),
+    errors (détail, au plus IMPORT_MAX_ERRORS), ignored / missing (colonnes), cancelled.
+    """
+    report = {"accepted": 0, "rejected": 0, "empty": 0, "errors": [], "ignored": [], "missing": [],
+              "cancelled": False}
+    mapping = None
+    line = 2  # La ligne 1 est l'en-tête
+    with text_index_deferred(db):
+        for frame in read_import_chunks(file_path, chunk_size):
+            if mapping is None:
+                mapping, report["ignored"], report["missing"] = import_column_map(list(frame.columns), variables)
+                if not mapping:
+                    raise ValueError("Aucune colonne du fichier ne correspond au tableau de variables.")
+            records, errors, empty = validate_import_frame(frame, mapping, line)
+            if records:
+                save_records(db, mode, variables, records)
+            report["accepted"] += len(records)
+            report["empty"] += empty
+            report["rejected"] += len(frame) - len(records) - empty
+            report["errors"].extend(errors[:IMPORT_MAX_ERRORS - len(report["errors"])])
+            line += len(frame)
+            if progress and progress(line - 2) is False:
+                report["cancelled"] = True
+                break
+    return report
+
+
+def write_import_errors(file_path, errors):
+    """Rapport des lignes rejetées (CSV : ligne, colonne, valeur, erreur)"""
+    with open(file_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["ligne", "colonne", "valeur", "erreur"])
+        writer.writerows(errors)
+
+# Cache d'agrégats de l'analyse : seuls les enregistrements ajoutés depuis le dernier rapport sont lus
+ANALYSIS_CACHE_KEY = "analysis_cache"
+# Incrémenté quand la forme des agrégats change : un ancien cache est alors reconstruit
+ANALYSIS_CACHE_VERSION = 3
+ANALYSIS_CHUNK_SIZE = 5000
+# Étapes du rapport, dans l'ordre où elles sont signalées à progress(étape, fait, total)
+ANALYSIS_STAGES = ("Lecture des enregistrements", "Données manquantes", "Conversion numérique",
+                   "Tests de normalité", "Tableaux de fréquences")
+NUMERIC_TYPES = ("NUM_CONTINUE", "NUM_DISCRETE")
+CATEGORICAL_TYPES = ("CATEGORIELLE", "BINAIRE", "CATEGORIELLE_MULTIPLE")
+
+
+def schema_signature(variables):
+    """Empreinte du tableau de variables ; un changement de schéma invalide le cache"""
+    schema = [(var.nom, var.type_variable, var.modalites) for var in variables]
+    return hashlib.sha1(json.dumps(schema).encode("utf-8")).hexdigest()
+
+
+def empty_aggregates(mode, variables):
+    return {"version": ANALYSIS_CACHE_VERSION, "signature": schema_signature(variables), "mode": mode,
+            "last_id": 0, "total": 0, "columns": {}}
+
+
+def empty_column():
+    return {"count": 0, "n": 0, "mean": 0.0, "m2": 0.0, "m3": 0.0, "m4": 0.0,
+            "min": None, "max": None, "freq": {}, "digest": [], "buffer": []}
+
+
+def update_column_stats(column, value, numeric, categorical):
+    """Ajoute une valeur non nulle aux agrégats d'une colonne ; une valeur vide ("") est manquante,
+    comme en stockage typé où elle devient NULL.
+
+    Moments exacts jusqu'à l'ordre 4 par la méthode de Welford ; les valeurs alimentent
+    aussi le résumé de quantiles de la colonne (voir compress_digest).
+    """
+    if value == "":
+        return
+    column["count"] += 1
+    if numeric:
+        try:
+            x = float(value)
+        except (TypeError, ValueError):
+            x = math.nan
+        if not math.isnan(x):
+            n1 = column["n"]
+            n = column["n"] = n1 + 1
+            delta = x - column["mean"]
+            delta_n = delta / n
+            delta_n2 = delta_n * delta_n
+            term1 = delta * delta_n * n1
+            column["mean"] += delta_n
+            column["m4"] += (term1 * delta_n2 * (n * n - 3 * n + 3) + 6 * delta_n2 * column["m2"]
+                             - 4 * delta_n * column["m3"])
+            column["m3"] += term1 * delta_n * (n - 2) - 3 * delta_n * column["m2"]
+            column["m2"] += term1
+            column["min"] = x if column["min"] is None else min(column["min"], x)
+            column["max"] = x if column["max"] is None else max(column["max"], x)
+            column["buffer"].append(x)
+            if len(column["buffer"]) >= DIGEST_BUFFER_SIZE:
+                flush_digest(column)
+    if categorical:
+        key = str(value)
+        column["freq"][key] = column["freq"].get(key, 0) + 1
+
+
+# Statistiques descriptives en flux : quantiles approchés par un résumé fusionnable (type t-digest).
+# Le résumé est une liste triée de centroïdes [moyenne, poids] ; sa taille est bornée par la
+# compression, quel que soit le nombre de valeurs, et deux résumés se fusionnent en les concaténant.
+DIGEST_COMPRESSION = 200
+DIGEST_BUFFER_SIZE = 1000
+
+
+def compress_digest(centroids, compression=DIGEST_COMPRESSION):
+    """Fusionne des centroïdes [moyenne, poids] en au plus ~compression centroïdes.
+
+    Fonction d'échelle k1 du t-digest : les centroïdes sont petits près des extrémités,
+    ce qui garde les quantiles extrêmes précis.
+    """
+    if len(centroids) <= 1:
+        return [list(c) for c in centroids]
+    centroids = sorted(centroids, key=lambda c: c[0])
+    total = sum(weight for _, weight in centroids)
+    scale = compression / (2 * math.pi)
+
+    def weight_limit(done):
+        k = scale * math.asin(2 * done / total - 1) + 1
+        if k >= scale * math.pi / 2:
+            return total
+        return (math.sin(k / scale) + 1) / 2 * total
+
+    merged = []
+    mean, weight = centroids[0]
+    done = 0.0
+    limit = weight_limit(done)
+    for c_mean, c_weight in centroids[1:]:
+        if done + weight + c_weight <= limit:
+            weight += c_weight
+            mean += (c_mean - mean) * c_weight / weight
+        else:
+            merged.append([mean, weight])
+            done += weight
+            limit = weight_limit(done)
+            mean, weight = c_mean, c_weight
+    merged.append([mean, weight])
+    return merged
+
+
+def flush_digest(column):
+    """Intègre les valeurs en attente au résumé de quantiles de la colonne"""
+    if column["buffer"]:
+        column["digest"] = compress_digest(column["digest"] + [[x, 1] for x in column["buffer"]])
+        column["buffer"] = []
+
+
+def digest_quantile(column, q):
+    """Quantile approché q (entre 0 et 1) d'une colonne numérique, None si elle est vide"""
+    flush_digest(column)
+    centroids = column["digest"]
+    if not centroids:
+        return None
+    total = sum(weight for _, weight in centroids)
+    target = q * total
+    # Centre de chaque centroïde sur l'axe des poids cumulés ; min et max aux extrémités
+    points = [(0.0, column["min"])]
+    cumulated = 0.0
+    for mean, weight in centroids:
+        points.append((cumulated + weight / 2, mean))
+        cumulated += weight
+    points.append((total, column["max"]))
+    for (w0, x0), (w1, x1) in zip(points, points[1:]):
+        if target <= w1:
+            return x0 if w1 == w0 else x0 + (x1 - x0) * (target - w0) / (w1 - w0)
+    return column["max"]
+
+
+def merge_column_stats(a, b):
+    """Agrégats de deux colonnes réunies (blocs, bases différentes), formules de Chan et Pébay"""
+    flush_digest(a)
+    flush_digest(b)
+    merged = empty_column()
+    merged["count"] = a["count"] + b["count"]
+    merged["freq"] = dict(a["freq"])
+    for key, count in b["freq"].items():
+        merged["freq"][key] = merged["freq"].get(key, 0) + count
+    na, nb = a["n"], b["n"]
+    n = merged["n"] = na + nb
+    if not n:
+        return merged
+    delta = b["mean"] - a["mean"]
+    merged["mean"] = a["mean"] + delta * nb / n
+    merged["m2"] = a["m2"] + b["m2"] + delta ** 2 * na * nb / n
+    merged["m3"] = (a["m3"] + b["m3"] + delta ** 3 * na * nb * (na - nb) / n ** 2
+                    + 3 * delta * (na * b["m2"] - nb * a["m2"]) / n)
+    merged["m4"] = (a["m4"] + b["m4"] + delta ** 4 * na * nb * (na * na - na * nb + nb * nb) / n ** 3
+                    + 6 * delta ** 2 * (na * na * b["m2"] + nb * nb * a["m2"]) / n ** 2
+                    + 4 * delta * (na * b["m3"] - nb * a["m3"]) / n)
+    merged["min"] = min(x for x in (a["min"], b["min"]) if x is not None)
+    merged["max"] = max(x for x in (a["max"], b["max"]) if x is not None)
+    merged["digest"] = compress_digest(a["digest"] + b["digest"])
+    return merged
+
+
+def merge_aggregates(a, b):
+    """Réunit les agrégats de deux bases (ou de deux parties d'une base) de même schéma"""
+    merged = dict(a, total=a["total"] + b["total"], columns=dict(a["columns"]))
+    for name, column in b["columns"].items():
+        merged["columns"][name] = merge_column_stats(merged["columns"].get(name, empty_column()), column)
+    return merged
+
+
+def descriptive_statistics(aggregates, variables):
+    """Statistiques descriptives des variables numériques, calculées depuis les agrégats"""
+    total = aggregates["total"]
+    results = {}
+    for var in variables:
+        column = aggregates["columns"].get(var.nom)
+        if var.type_variable not in NUMERIC_TYPES or column is None or var.nom in results:
+            continue
+        n = column["n"]
+        stats = {"n": n, "missing": total - n}
+        if n:
+            m2 = column["m2"]
+            stats.update({
+                "mean": column["mean"],
+                "std": math.sqrt(m2 / (n - 1)) if n > 1 else 0.0,
+                "min": column["min"],
+                "q1": digest_quantile(column, 0.25),
+                "median": digest_quantile(column, 0.5),
+                "q3": digest_quantile(column, 0.75),
+                "max": column["max"],
+                # Coefficients d'asymétrie et d'aplatissement (excès), estimateurs biaisés comme scipy
+                "skewness": math.sqrt(n) * column["m3"] / m2 ** 1.5 if m2 else 0.0,
+                "kurtosis": n * column["m4"] / (m2 * m2) - 3 if m2 else 0.0,
+            })
+        results[var.nom] = stats
+    return results
+
+
+BINARY_LABELS = ((1, "Oui"), (0, "Non"))
+
+
+def frequency_key(value):
+    """Clé d'une modalité : 1, 1.0 et "1" sont la même modalité"""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    key = str(value)
+    return key[:-2] if key.endswith(".0") and key[:-2].lstrip("-").isdigit() else key
+
+
+def frequency_tables(db, mode, variables, total=None, aggregates=None):
+    """Effectifs et pourcentages par modalité des variables catégorielles.
+
+    Avec aggregates (voir update_analysis_cache), les effectifs viennent du cache, sans lire la
+    table. Sinon SQLite les calcule : une requête GROUP BY par variable (une seule pour toutes
+    les colonnes 0/1 d'une variable à choix multiples). Retourne {variable: {"type", "rows":
+    [{"label", "count", "percentage"}], "missing"}} ; les lignes suivent l'ordre des modalités,
+    les valeurs hors modalités sont ajoutées à la fin.
+    """
+    table = data_table(mode)
+    if aggregates is not None:
+        total = aggregates["total"]
+    elif total is None:
+        total = count_records(db, mode)
+
+    def percentage(count):
+        return (count / total) * 100 if total else 0.0
+
+    def cached_counts(key):
+        counts = {}
+        for value, count in aggregates["columns"].get(key, {}).get("freq", {}).items():
+            value = frequency_key(value)
+            counts[value] = counts.get(value, 0) + count
+        return counts
+
+    tables = {}
+    for var in variables:
+        if var.type_variable not in CATEGORICAL_TYPES or var.nom in tables:
+            continue
+
+        if var.type_variable == "CATEGORIELLE_MULTIPLE":
+            if not var.modalites:
+                continue
+            if aggregates is not None:
+                counts = [cached_counts(mod).get("1", 0) for _, mod in var.modalites]
+            else:
+                # Nombre de « Oui » par modalité, en une seule lecture de la table
+                sums = ", ".join(f"SUM({field_expression(mode, mod)} = 1)" for _, mod in var.modalites)
+                counts = db.execute(f"SELECT {sums} FROM {table}").fetchone()
+            rows = [{"label": mod, "count": count or 0, "percentage": percentage(count or 0)}
+                    for (_, mod), count in zip(var.modalites, counts)]
+            tables[var.nom] = {"type": var.type_variable, "rows": rows, "missing": None}
+            continue
+
+        if aggregates is not None:
+            # Le cache ne compte pas les valeurs vides : elles sont manquantes
+            counts = cached_counts(var.nom)
+            missing = total - sum(counts.values())
+        else:
+            expression = field_expression(mode, var.nom)
+            counts = {}
+            missing = 0
+            for value, count in db.execute(f"SELECT {expression}, COUNT(*) FROM {table} GROUP BY 1"):
+                if value is None or value == "":
+                    missing += count
+                else:
+                    key = frequency_key(value)
+                    counts[key] = counts.get(key, 0) + count
+
+        labels = BINARY_LABELS if var.type_variable == "BINAIRE" else var.modalites
+        rows = [{"label": f"{num} - {label}", "count": counts.pop(str(num), 0)} for num, label in labels]
+        rows += [{"label": key, "count": count} for key, count in sorted(counts.items())]
+        for row in rows:
+            row["percentage"] = percentage(row["count"])
+        tables[var.nom] = {"type": var.type_variable, "rows": rows,
+                           "missing": {"count": missing, "percentage": percentage(missing)}}
+    return tables
+
+
+def save_aggregates(db, cache):
+    for column in cache["columns"].values():
+        flush_digest(column)
+    with db:
+        set_meta(db, ANALYSIS_CACHE_KEY, json.dumps(cache))
+
+
+def iter_records(db, mode, after_id=0, chunk_size=ANALYSIS_CHUNK_SIZE):
+    """Génère (id, dictionnaire) des enregistrements d'identifiant supérieur à after_id"""
+    cursor = db.cursor()
+    if mode == "typed":
+        cursor.execute(f"SELECT * FROM {TYPED_TABLE} WHERE id > ? ORDER BY id", (after_id,))
+        names = [col[0] for col in cursor.description]
+        while rows := cursor.fetchmany(chunk_size):
+            for row in rows:
+                record = dict(zip(names, row))
+                yield record.pop("id"), record
+    else:
+        cursor.execute("SELECT id, form_data FROM data WHERE id > ? ORDER BY id", (after_id,))
+        while rows := cursor.fetchmany(chunk_size):
+            for row_id, form_data in rows:
+                yield row_id, json.loads(form_data)
+
+
+def update_analysis_cache(db, mode, variables, progress=None):
+    """Met à jour et enregistre les agrégats par variable avec les nouveaux enregistrements.
+
+    Le cache est reconstruit si le schéma ou le mode de stockage a changé, ou si des
+    enregistrements ont été supprimés. progress(lus, à lire) est appelée à chaque bloc ;
+    si elle retourne False, les agrégats déjà calculés sont enregistrés et la fonction
+    retourne None. Retourne les agrégats.
+    """
+    cache = json.loads(get_meta(db, ANALYSIS_CACHE_KEY, "null"))
+    if (not cache or cache.get("version") != ANALYSIS_CACHE_VERSION
+            or cache["signature"] != schema_signature(variables) or cache["mode"] != mode):
+        cache = empty_aggregates(mode, variables)
+
+    numeric = {var.nom for var in variables if var.type_variable in NUMERIC_TYPES}
+    categorical = {var.nom for var in variables if var.type_variable in CATEGORICAL_TYPES}
+    categorical.update(mod for var in variables if var.type_variable == "CATEGORIELLE_MULTIPLE"
+                       for num, mod in var.modalites)
+
+    for _ in range(2):
+        columns = cache["columns"]
+        pending = max(count_records(db, mode) - cache["total"], 0)
+        done = 0
+        for row_id, record in iter_records(db, mode, cache["last_id"]):
+            if progress and done % ANALYSIS_CHUNK_SIZE == 0 and not progress(done, pending):
+                # Annulation : le travail fait reste acquis pour le prochain rapport
+                save_aggregates(db, cache)
+                return None
+            done += 1
+            cache["total"] += 1
+            cache["last_id"] = row_id
+            for key, value in record.items():
+                column = columns.get(key)
+                if column is None:
+                    column = columns[key] = empty_column()
+                if value is not None:
+                    update_column_stats(column, value, key in numeric, key in categorical)
+
+        # Des suppressions rendent les agrégats faux : reconstruction complète
+        if cache["total"] == count_records(db, mode):
+            break
+        cache = empty_aggregates(mode, variables)
+
+    save_aggregates(db, cache)
+    return cache
+
+
+def invalidate_analysis_cache(db):
+    db.execute("DELETE FROM meta WHERE key = ?", (ANALYSIS_CACHE_KEY,))
+
+
+# Tests de normalité : au-delà de SHAPIRO_MAX_N valeurs, Shapiro-Wilk est remplacé selon la stratégie
+#   subsample : Shapiro-Wilk sur un sous-échantillon tiré avec une graine fixe (reproductible)
+#   dagostino : test K² de D'Agostino-Pearson sur toutes les valeurs
+#   anderson  : test d'Anderson-Darling sur toutes les valeurs
+NORMALITY_STRATEGIES = ("subsample", "dagostino", "anderson")
+NORMALITY_STRATEGY = "subsample"
+SHAPIRO_MAX_N = 5000
+NORMALITY_SEED = 0
+NORMALITY_CACHE_KEY = "normality_cache"
+# Nombre total de valeurs à partir duquel les tests sont répartis sur plusieurs processus :
+# en dessous, le démarrage des processus (import de scipy) coûte plus que les tests eux-mêmes
+NORMALITY_PARALLEL_MIN = 5000000
+
+
+def anderson_pvalue(values):
+    from scipy import stats
+
+    try:
+        return stats.anderson(values, method="interpolate").pvalue
+    except TypeError:
+        # scipy < 1.17 : p-value interpolée entre les valeurs critiques tabulées (15 % à 1 %)
+        import numpy as np
+
+        result = stats.anderson(values)
+        return float(np.interp(result.statistic, result.critical_values, result.significance_level / 100))
+
+
+def normality_test(values, strategy=NORMALITY_STRATEGY, max_n=SHAPIRO_MAX_N, seed=NORMALITY_SEED):
+    """Tests de normalité d'une colonne (tableau numpy sans valeur manquante).
+
+    Retourne {"test": nom du premier test, "shapiro_p": sa p-value, "ks_p": p-value de
+    Kolmogorov-Smirnov}. Fonction de module : elle peut être exécutée dans un autre processus.
+    """
+    import numpy as np
+    from scipy import stats
+
+    n = len(values)
+    if n <= max_n:
+        test, p = "Shapiro-Wilk", stats.shapiro(values).pvalue
+    elif strategy == "dagostino":
+        test, p = "D'Agostino-Pearson", stats.normaltest(values).pvalue
+    elif strategy == "anderson":
+        test, p = "Anderson-Darling", anderson_pvalue(values)
+    else:
+        sample = np.random.default_rng(seed).choice(values, max_n, replace=False)
+        test, p = f"Shapiro-Wilk ({max_n}/{n})", stats.shapiro(sample).pvalue
+    ks = stats.kstest(values, 'norm', args=(values.mean(), values.std(ddof=1))).pvalue
+    return {"test": test, "shapiro_p": float(p), "ks_p": float(ks)}
+
+
+def run_normality_tests(samples, strategy=NORMALITY_STRATEGY, workers=None, progress=None):
+    """Teste chaque colonne de samples ({nom: tableau}), en parallèle si le volume le justifie.
+
+    workers=1 force l'exécution dans le processus courant. progress(fait, total) est appelée
+    avant chaque résultat ; si elle retourne False, la fonction retourne None.
+    """
+    total = len(samples)
+    workers = min(workers or os.cpu_count() or 1, total)
+    if workers < 2 or sum(len(values) for values in samples.values()) < NORMALITY_PARALLEL_MIN:
+        results = {}
+        for i, (name, values) in enumerate(samples.items()):
+            if progress and not progress(i, total):
+                return None
+            results[name] = normality_test(values, strategy)
+        return results
+
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    results = {}
+    # spawn : les processus ne copient pas le thread base de données ni la connexion SQLite
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        futures = {pool.submit(normality_test, values, strategy): name for name, values in samples.items()}
+        for i, future in enumerate(as_completed(futures)):
+            if progress and not progress(i, total):
+                pool.shutdown(cancel_futures=True)
+                return None
+            results[futures[future]] = future.result()
+    return {name: results[name] for name in samples}
+
+
+def column_signature(column, strategy):
+    """Empreinte des agrégats d'une colonne et des paramètres du test : un résultat n'est
+    réutilisé que si rien n'a changé, sans relire les valeurs"""
+    moments = [column[key] for key in ("n", "mean", "m2", "m3", "m4", "min", "max")]
+    digest = hashlib.sha1(json.dumps(moments).encode())
+    digest.update(f"{strategy}:{SHAPIRO_MAX_N}:{NORMALITY_SEED}".encode())
+    return digest.hexdigest()
+
+
+_column_indexes = {}
+
+
+def column_index(variables):
+    """Index colonne -> variable, construit une fois par schéma.
+
+    Une variable à choix multiples possède une colonne par modalité ; en cas de doublon,
+    la première variable du tableau l'emporte. L'ordre des clés est celui du tableau.
+    """
+    signature = schema_signature(variables)
+    index = _column_indexes.get(signature)
+    if index is None:
+        index = {}
+        for var in variables:
+            index.setdefault(var.nom, var)
+            if var.type_variable == "CATEGORIELLE_MULTIPLE":
+                for _, mod in var.modalites:
+                    index.setdefault(mod, var)
+        if len(_column_indexes) >= 8:
+            _column_indexes.clear()
+        _column_indexes[signature] = index
+    return index
+
+
+def load_numeric_columns(db, mode, names):
+    """Charge uniquement les colonnes numériques demandées (json_extract en mode JSON)"""
+    import pandas as pd
+
+    expressions = ", ".join(f"{field_expression(mode, name)} AS {quote_identifier(name)}" for name in names)
+    df = pd.read_sql_query(f"SELECT {expressions} FROM {data_table(mode)} ORDER BY id", db)
+    return df.apply(pd.to_numeric, errors="coerce")
+
+
+def load_numeric_values(db, mode, name):
+    """Valeurs non manquantes d'une variable numérique (tableau numpy), pour ses graphiques"""
+    return load_numeric_columns(db, mode, [name])[name].dropna().to_numpy(dtype=float)
+
+
+@traced("Analyse", rows=lambda report: report and report.get("total_records"))
+def generate_analysis_report(db, mode, variables, progress=None, strategy=NORMALITY_STRATEGY, workers=None):
+    """Génère un rapport d'analyse exploratoire.
+
+    progress(étape, fait, total), où étape indexe ANALYSIS_STAGES, est appelée au fil du calcul ;
+    si elle retourne False le rapport est abandonné et la fonction retourne None.
+    strategy et workers règlent les tests de normalité (voir run_normality_tests).
+    Le rapport est construit à partir des agrégats en cache : seules les colonnes numériques
+    modifiées depuis le dernier rapport sont relues, pour leurs tests de normalité.
+    """
+    def step(stage, done, total):
+        mark_stage("Analyse", ANALYSIS_STAGES[stage])
+        return progress is None or progress(stage, done, total)
+
+    mark_stage("Analyse", ANALYSIS_STAGES[0])
+    aggregates = update_analysis_cache(db, mode, variables,
+                                       progress and (lambda done, total: step(0, done, total)))
+    if aggregates is None:
+        return None
+    columns = aggregates["columns"]
+    total_records = aggregates["total"]
+
+    if not total_records:
+        return {"error": "Aucune donnée disponible pour l'analyse"}
+
+    # Colonnes dans l'ordre du tableau de variables, puis les autres
+    index = column_index(variables)
+    ordered = [name for name in index if name in columns]
+    ordered += sorted(name for name in columns if name not in index)
+
+    # 1. Rapport sur les données manquantes, à partir des effectifs déjà agrégés
+    if not step(1, 0, 1):
+        return None
+    missing_data = {}
+    for col in ordered:
+        missing_count = total_records - columns[col]["count"]
+        var = index.get(col)
+        missing_data[col] = {
+            "count": int(missing_count),
+            "percentage": (missing_count / total_records) * 100,
+            "type": var.type_variable if var else "Inconnu"
+        }
+
+    # 2. Variables numériques : les graphiques chargent leurs valeurs à la demande (load_numeric_values)
+    numeric_vars = {}
+    for var in variables:
+        if var.type_variable in NUMERIC_TYPES and var.nom in columns and var.nom not in numeric_vars:
+            numeric_vars[var.nom] = {"type": var.type_variable}
+
+    # 3. Tests de normalité : seules les colonnes dont les agrégats ont changé sont lues et retestées
+    cache = json.loads(get_meta(db, NORMALITY_CACHE_KEY, "{}"))
+    signatures = {name: column_signature(columns[name], strategy)
+                  for name in numeric_vars if columns[name]["n"] > 3}  # Minimum 3 valeurs pour les tests
+    stale = [name for name, signature in signatures.items() if cache.get(name, {}).get("hash") != signature]
+    if not step(2, 0, 1):
+        return None
+    samples = {}
+    if stale:
+        df = load_numeric_columns(db, mode, stale)
+        samples = {name: df[name].dropna().to_numpy(dtype=float) for name in stale}
+        del df
+
+    if not step(3, 0, len(samples)):
+        return None
+    tested = run_normality_tests(samples, strategy, workers, progress and (lambda done, total: step(3, done, total)))
+    if tested is None:
+        return None
+    cache = {name: {"hash": signatures[name], "result": tested[name] if name in tested else cache[name]["result"]}
+             for name in signatures}
+    with db:
+        set_meta(db, NORMALITY_CACHE_KEY, json.dumps(cache))
+    normality_tests = {name: cache[name]["result"] for name in signatures}
+
+    # 4. Tableaux de fréquences des variables catégorielles, à partir des effectifs déjà agrégés
+    if not step(4, 0, 1):
+        return None
+    frequencies = frequency_tables(db, mode, variables, aggregates=aggregates)
+
+    # 5. Générer un résumé textuel à partir des agrégats
+    summary = "Rapport d'Analyse Exploratoire\n"
+    summary += "=" * 40 + "\n\n"
+    summary += f"Nombre total d'enregistrements: {total_records}\n"
+    summary += f"Nombre de variables: {len(columns)}\n\n"
+
+    summary += "Variables Numériques:\n"
+    summary += "-" * 40 + "\n"
+    for var_name in numeric_vars:
+        column = columns[var_name]
+        p_missing = ((total_records - column["n"]) / total_records) * 100
+        summary += f"{var_name}: {column['n']} valeurs, {p_missing:.1f}% manquants"
+        if column["n"]:
+            std = math.sqrt(column["m2"] / (column["n"] - 1)) if column["n"] > 1 else 0.0
+            summary += (f" (moyenne {column['mean']:.4g}, écart-type {std:.4g}, "
+                        f"min {column['min']:.4g}, max {column['max']:.4g})")
+        summary += "\n"
+    summary += "\n"
+
+    summary += "Variables Catégorielles:\n"
+    summary += "-" * 40 + "\n"
+    for var in variables:
+        if var.type_variable in CATEGORICAL_TYPES:
+            column = columns.get(var.nom)
+            n_missing = total_records - column["count"] if column else total_records
+            p_missing = (n_missing / total_records) * 100
+            summary += f"{var.nom}: {p_missing:.1f}% manquants"
+            if column and column["freq"]:
+                summary += " (" + ", ".join(f"{k}: {v}" for k, v in sorted(column["freq"].items())) + ")"
+            summary += "\n"
+
+    # Préparer le rapport final
+    report = {
+        "summary": summary,
+        "missing_data": missing_data,
+        "numeric_vars": numeric_vars,
+        "normality_tests": normality_tests,
+        "descriptive_stats": descriptive_statistics(aggregates, variables),
+        "frequency_tables": frequencies,
+        "total_records": total_records
+    }
+
+    return report
@@ -0,0 +1,122 @@
+# Règles de saisie par type de variable : contrôle et conversion d'une valeur texte.
+# Sans PyQt6 : les mêmes règles servent au formulaire, au tableau des enregistrements et à l'import.
+# Un nouveau type se déclare avec register_field_rule (ou form_fields.register_field_type).
+import datetime
+import re
+
+TIME_PATTERN = re.compile(r"^([0-1][0-9]|2[0-3]):[0-5][0-9]:[0-5][0-9]$")
+DECIMAL_PATTERN = re.compile(r"^[+-]?(\d+\.?\d*|\.\d+)$")
+INTEGER_PATTERN = re.compile(r"^[+-]?\d+$")
+DATE_PATTERN = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+# Bornes du validateur d'entiers du formulaire (QIntValidator)
+INTEGER_MIN, INTEGER_MAX = -2 ** 31, 2 ** 31 - 1
+
+
+class FieldRule:
+    """Règle d'un type de variable (sans état : une instance sert toutes les variables)"""
+
+    sized = False  # La taille de la variable limite la longueur saisie
+    empty = ""     # Valeur enregistrée pour une saisie vide (None : clé non enregistrée)
+
+    def convert(self, var, text):
+        """Valeur à enregistrer pour text (sans espaces autour) ; ValueError(message) si invalide"""
+        if not text:
+            return self.empty
+        if self.sized and var is not None and var.taille and len(text) > var.taille:
+            raise ValueError(f"Plus de {var.taille} caractères")
+        return self.check(var, text)
+
+    def check(self, var, text):
+        return text
+
+
+class TextRule(FieldRule):
+    sized = True
+
+
+class ContinuousRule(TextRule):
+    def check(self, var, text):
+        if ',' in text:
+            raise ValueError("Utilisez le point (.) comme séparateur décimal")
+        # Notation décimale seulement, comme le formulaire : ni exposant, ni nan, ni inf
+        if not DECIMAL_PATTERN.match(text):
+            raise ValueError("Valeur numérique invalide")
+        return text
+
+
+class DiscreteRule(TextRule):
+    def check(self, var, text):
+        if not INTEGER_PATTERN.match(text):
+            raise ValueError("Doit être un nombre entier")
+        if not INTEGER_MIN <= int(text) <= INTEGER_MAX:
+            raise ValueError(f"Entier hors limites ({INTEGER_MIN} à {INTEGER_MAX})")
+        return text
+
+
+class BinaryRule(FieldRule):
+    def check(self, var, text):
+        if text not in ("0", "1"):
+            raise ValueError("Valeur attendue : 1 (Oui) ou 0 (Non)")
+        return int(text)
+
+
+class MultipleChoiceRule(BinaryRule):
+    """Une colonne 0/1 par modalité ; vide, la clé n'est pas enregistrée"""
+
+    empty = None
+
+
+class CategoricalRule(FieldRule):
+    def check(self, var, text):
+        # Le code de la modalité ou son libellé
+        for num, label in var.modalites:
+            if text == str(num) or text.lower() == label.strip().lower():
+                return num
+        codes = ", ".join(str(num) for num, _ in var.modalites)
+        raise ValueError(f"Modalité inconnue (codes : {codes})")
+
+
+class DateRule(FieldRule):
+    def check(self, var, text):
+        if DATE_PATTERN.match(text):
+            try:
+                datetime.date.fromisoformat(text)
+                return text
+            except ValueError:
+                pass
+        raise ValueError("Date attendue au format aaaa-mm-jj")
+
+
+class TimeRule(FieldRule):
+    def check(self, var, text):
+        if not TIME_PATTERN.match(text):
+            raise ValueError("Heure attendue au format hh:mm:ss")
+        return text
+
+
+DEFAULT_RULE = FieldRule()
+FIELD_RULES = {
+    "NUM_CONTINUE": ContinuousRule(),
+    "NUM_DISCRETE": DiscreteRule(),
+    "TEXTE": TextRule(),
+    "BINAIRE": BinaryRule(),
+    "CATEGORIELLE": CategoricalRule(),
+    "CATEGORIELLE_MULTIPLE": MultipleChoiceRule(),
+    "DATE": DateRule(),
+    "TEMPS": TimeRule(),
+}
+
+
+def register_field_rule(type_variable, rule):
+    """Déclare (ou remplace) la règle de saisie d'un type de variable"""
+    FIELD_RULES[type_variable.strip().upper()] = rule
+
+
+def field_rule(type_variable):
+    """Règle du type ; un type sans règle accepte le texte tel quel"""
+    return FIELD_RULES.get(type_variable, DEFAULT_RULE)
+
+
+def convert_text(var, text):
+    """Convertit la saisie text de var (None : colonne hors schéma) ; ValueError si elle est invalide"""
+    return field_rule(var.type_variable if var is not None else None).convert(var, text.strip())
@@ -0,0 +1,188 @@
+# Champs du formulaire : un gestionnaire par type de variable.
+# Chaque gestionnaire construit ses widgets, lit la saisie (validée par les règles de field_rules.py)
+# et la remet à zéro. Un nouveau type se branche avec register_field_type, sans toucher à main.py.
+from PyQt6.QtWidgets import QLineEdit, QComboBox, QDateEdit, QLabel
+from PyQt6.QtCore import QDate, QRegularExpression
+from PyQt6.QtGui import QDoubleValidator, QIntValidator, QRegularExpressionValidator
+
+from field_rules import TIME_PATTERN, field_rule, register_field_rule
+
+ERROR_STYLE = "border: 1px solid red;"
+
+
+class FieldHandler:
+    """Gestionnaire d'un type de variable (sans état : une instance sert toutes les variables)"""
+
+    label = "Valeur:"
+
+    def build(self, var, layout):
+        """Ajoute les widgets de var à layout et retourne la saisie à conserver dans inputs"""
+        raise NotImplementedError
+
+    def read(self, var, widget, data, errors):
+        """Ajoute la valeur saisie à data, ou un message à errors si elle est invalide"""
+        raise NotImplementedError
+
+    def reset(self, widget):
+        widget.clear()
+        widget.setStyleSheet("")
+
+    def first_widget(self, widget):
+        return widget
+
+
+class LineEditField(FieldHandler):
+    placeholder = "Entrez du texte"
+    sized = True  # La taille de la variable limite la longueur saisie
+
+    def make_validator(self):
+        return None
+
+    def build(self, var, layout):
+        field = QLineEdit()
+        validator = self.make_validator()
+        if validator is not None:
+            field.setValidator(validator)
+        field.setPlaceholderText(self.placeholder)
+        # Ajouter le contrôle de taille si disponible
+        if self.sized and var.taille:
+            field.setMaxLength(var.taille)
+        layout.addRow(QLabel(self.label), field)
+        return field
+
+    def read(self, var, widget, data, errors):
+        try:
+            data[var.nom] = field_rule(var.type_variable).convert(var, widget.text().strip())
+        except ValueError as e:
+            errors.append(f"{var.nom}: {e}")
+            widget.setStyleSheet(ERROR_STYLE)
+            return
+        widget.setStyleSheet("")
+
+
+class ContinuousField(LineEditField):
+    placeholder = "Entrez un nombre décimal (ex: 12.34)"
+
+    def make_validator(self):
+        # Validateur pour nombres à virgule flottante (point décimal)
+        validator = QDoubleValidator()
+        validator.setNotation(QDoubleValidator.Notation.StandardNotation)
+        return validator
+
+
+class DiscreteField(LineEditField):
+    placeholder = "Entrez un nombre entier"
+
+    def make_validator(self):
+        return QIntValidator()
+
+
+class TimeField(LineEditField):
+    label = "Heure:"
+    placeholder = "hh:mm:ss"
+    sized = False
+
+    def make_validator(self):
+        # Validateur pour le format hh:mm:ss
+        regex = QRegularExpression(TIME_PATTERN.pattern)
+        return QRegularExpressionValidator(regex)
+
+
+class ComboField(FieldHandler):
+    label = "Sélection:"
+
+    def reset(self, widget):
+        widget.setCurrentIndex(0)
+
+
+class BinaryField(ComboField):
+    def build(self, var, layout):
+        combo = QComboBox()
+        combo.addItems(["1 (Oui)", "0 (Non)"])
+        layout.addRow(QLabel(self.label), combo)
+        return combo
+
+    def read(self, var, widget, data, errors):
+        data[var.nom] = 1 if "1" in widget.currentText() else 0
+
+
+class CategoricalField(ComboField):
+    def build(self, var, layout):
+        combo = QComboBox()
+        combo.addItem("-- Sélectionnez une option --", "")
+        for num, label_mod in var.modalites:
+            combo.addItem(f"{num} - {label_mod}", num)
+        layout.addRow(QLabel(self.label), combo)
+        return combo
+
+    def read(self, var, widget, data, errors):
+        data[var.nom] = widget.currentData()
+
+
+class MultipleChoiceField(FieldHandler):
+    """Une liste Oui/Non par modalité ; la saisie est [(identifiant, combo)]"""
+
+    def build(self, var, layout):
+        combos = []
+        for num, mod in var.modalites:
+            combo = QComboBox()
+            combo.addItem("-- Sélectionnez --", "")  # Valeur vide par défaut
+            combo.addItem("1 (Oui)", 1)
+            combo.addItem("0 (Non)", 0)
+            combos.append((f"{var.nom}_{num}", combo))
+            layout.addRow(QLabel(f"{mod}:"), combo)
+        return combos
+
+    def read(self, var, widget, data, errors):
+        for (_, mod), (_, combo) in zip(var.modalites, widget):
+            # Récupérer la valeur sélectionnée (peut être vide, 1 ou 0)
+            value = combo.currentData()
+            if value != "":
+                data[mod] = value
+            # Si rien n'est sélectionné, la clé n'est pas ajoutée (reste vide dans la base)
+
+    def reset(self, widget):
+        for _, combo in widget:
+            combo.setCurrentIndex(0)
+
+    def first_widget(self, widget):
+        return widget[0][1] if widget else None
+
+
+class DateField(FieldHandler):
+    label = "Date:"
+
+    def build(self, var, layout):
+        date_edit = QDateEdit()
+        date_edit.setCalendarPopup(True)
+        date_edit.setDate(QDate.currentDate())
+        date_edit.setDisplayFormat("dd/MM/yyyy")
+        layout.addRow(QLabel(self.label), date_edit)
+        return date_edit
+
+    def read(self, var, widget, data, errors):
+        data[var.nom] = widget.date().toString("yyyy-MM-dd")
+
+    def reset(self, widget):
+        widget.setDate(QDate.currentDate())
+
+
+FIELD_HANDLERS = {
+    "NUM_CONTINUE": ContinuousField(),
+    "NUM_DISCRETE": DiscreteField(),
+    "TEXTE": LineEditField(),
+    "BINAIRE": BinaryField(),
+    "CATEGORIELLE": CategoricalField(),
+    "CATEGORIELLE_MULTIPLE": MultipleChoiceField(),
+    "DATE": DateField(),
+    "TEMPS": TimeField(),
+}
+
+
+def register_field_type(type_variable, handler, rule=None):
+    """Déclare (ou remplace) le gestionnaire d'un type de variable, et sa règle de saisie si elle est donnée
+    (sans règle, le texte est accepté tel quel dans le tableau des enregistrements et à l'import)"""
+    FIELD_HANDLERS[type_variable.strip().upper()] = handler
+    if rule is not None:
+        register_field_rule(type_variable, rule)
+
@@ -0,0 +1,202 @@
+# Mesure des opérations longues : durée, lignes traitées et pic mémoire du processus à la fin de chaque étape.
+# Désactivée par défaut (coût négligeable) ; activée par la variable d'environnement EXDFORM_TRACE
+# ("1" ou chemin du fichier de trace) ou depuis le panneau "Performances" de l'application.
+# La trace est écrite au format Trace Event (JSON), lisible dans chrome://tracing ou Perfetto.
+import atexit
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+
+TRACE_ENV = "EXDFORM_TRACE"
+TRACE_FILE_NAME = "exdform-trace.json"
+# Spans conservés au plus : une longue session de saisie ne fait pas grossir la mémoire
+MAX_EVENTS = 100000
+
+
+def peak_memory_mb():
+    """Pic de mémoire résidente du processus (Mo), ou None si le système ne le fournit pas"""
+    try:
+        import resource
+    except ImportError:
+        # Windows : psutil s'il est installé
+        try:
+            import psutil
+        except ImportError:
+            return None
+        return psutil.Process().memory_info().peak_wset / 2 ** 20
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Octets sous macOS, kilo-octets sous Linux
+    return peak / 2 ** 20 if sys.platform == "darwin" else peak / 1024
+
+
+class Tracer:
+    """Collecte les spans de tous les threads ; chaque span devient un événement "X" de la trace"""
+
+    def __init__(self):
+        self.enabled = False
+        self.path = None
+        self.events = deque(maxlen=MAX_EVENTS)
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.origin = time.perf_counter()
+
+    def enable(self, path=None):
+        self.enabled = True
+        self.path = path or self.path
+
+    def disable(self):
+        self.enabled = False
+
+    def clear(self):
+        with self.lock:
+            self.events.clear()
+
+    def stack(self):
+        if not hasattr(self.local, "stack"):
+            self.local.stack = []
+        return self.local.stack
+
+    def record(self, name, start, args):
+        end = time.perf_counter()
+        event = {
+            "name": name, "ph": "X", "pid": os.getpid(), "tid": threading.get_ident(),
+            "ts": round((start - self.origin) * 1e6), "dur": round((end - start) * 1e6),
+            # Pic du processus depuis son lancement (pas celui du span) : mesurer chaque span
+            # avec tracemalloc ralentirait toutes les opérations
+            "args": dict(args, process_peak_mb=peak_memory_mb()),
+        }
+        with self.lock:
+            self.events.append(event)
+
+    def summary(self):
+        """Par opération : appels, durée totale, maximale et dernière (ms), dernières lignes et pic mémoire du processus"""
+        with self.lock:
+            events = list(self.events)
+        table = {}
+        for event in events:
+            entry = table.setdefault(event["name"], {"calls": 0, "total_ms": 0.0, "max_ms": 0.0})
+            duration = event["dur"] / 1000
+            entry["calls"] += 1
+            entry["total_ms"] += duration
+            entry["max_ms"] = max(entry["max_ms"], duration)
+            entry["last_ms"] = duration
+            entry["rows"] = event["args"].get("rows", entry.get("rows"))
+            entry["process_peak_mb"] = event["args"].get("process_peak_mb")
+        return table
+
+    def write(self, path=None):
+        """Écrit la trace (format Trace Event) ; retourne le chemin du fichier"""
+        path = path or self.path or default_trace_path()
+        with self.lock:
+            events = list(self.events)
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+        return path
+
+
+TRACER = Tracer()
+
+
+def default_trace_path():
+    from core import schema_cache_dir
+
+    return os.path.join(schema_cache_dir(), TRACE_FILE_NAME)
+
+
+class Span:
+    """Opération mesurée ; ses arguments (ex. rows) sont renseignés pendant l'exécution"""
+
+    def __init__(self, name, args):
+        self.name = name
+        self.args = args
+        self.stage = None
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        TRACER.stack().append(self)
+        return self.args
+
+    def __exit__(self, *exc):
+        self.end_stage()
+        TRACER.stack().pop()
+        TRACER.record(self.name, self.start, self.args)
+        return False
+
+    def begin_stage(self, name):
+        name = f"{self.name} : {name}"
+        if self.stage is not None and self.stage[0] == name:
+            return
+        self.end_stage()
+        self.stage = (name, time.perf_counter())
+
+    def end_stage(self):
+        if self.stage is not None:
+            TRACER.record(self.stage[0], self.stage[1], {})
+            self.stage = None
+
+
+class NoSpan:
+    def __enter__(self):
+        return {}
+
+    def __exit__(self, *exc):
+        return False
+
+
+def span(name, **args):
+    """with span("export", format="csv") as info: ... ; info["rows"] = n"""
+    return Span(name, args) if TRACER.enabled else NoSpan()
+
+
+def mark_stage(owner, name):
+    """Début de l'étape name du span owner en cours ; l'étape précédente se termine.
+
+    Sans effet si l'étape est déjà en cours : l'appel peut accompagner chaque avancement.
+    """
+    if not TRACER.enabled:
+        return
+    for current in reversed(TRACER.stack()):
+        if current.name == owner:
+            current.begin_stage(name)
+            return
+
+
+def traced(name, rows=None):
+    """Décorateur : mesure chaque appel ; rows(résultat) donne le nombre de lignes traitées"""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not TRACER.enabled:
+                return fn(*args, **kwargs)
+            with span(name) as info:
+                result = fn(*args, **kwargs)
+                count = rows(result) if rows else result
+                if isinstance(count, int) and not isinstance(count, bool):
+                    info["rows"] = count
+                return result
+        return wrapper
+    return decorate
+
+
+def enable_from_environment(write_at_exit=True):
+    """Active la mesure si EXDFORM_TRACE est définie ; la trace est écrite à la sortie,
+    sauf si write_at_exit est faux (l'appelant l'écrit lui-même)"""
+    value = os.environ.get(TRACE_ENV, "").strip()
+    if not value or value == "0":
+        return False
+    TRACER.enable(None if value.lower() in ("1", "true", "yes") else value)
+    if write_at_exit:
+        atexit.register(write_on_exit)
+    return True
+
+
+def write_on_exit():
+    if TRACER.events:
+        TRACER.write()
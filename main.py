@@ -1,32 +1,22 @@
-# Configure l'environnement pour forcer Matplotlib à utiliser PyQt6
 import os
-
-os.environ["QT_API"] = "pyqt6"
-import matplotlib
-
-matplotlib.use("QtAgg")
-
 import sys
-import re
-import json
-import sqlite3
-import csv
-import numpy as np
-import pandas as pd
-from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
-from matplotlib.figure import Figure
-from scipy import stats
+import threading
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QPushButton, QLabel,
     QFileDialog, QLineEdit, QComboBox, QCheckBox, QScrollArea, QMessageBox,
     QFormLayout, QDateEdit, QGroupBox, QFrame, QHBoxLayout, QSpacerItem, QSizePolicy,
-    QStyle, QDialog, QTextEdit, QTabWidget, QTableWidget, QTableWidgetItem,
-    QHeaderView, QVBoxLayout, QSplitter, QGridLayout
+    QStyle, QDialog, QVBoxLayout, QSplitter, QProgressDialog
+)
+from PyQt6.QtCore import Qt, QTimer, QObject, QThread, pyqtSignal, pyqtSlot
+from PyQt6.QtGui import QFont, QPalette, QColor, QTextCursor
+from form_fields import FIELD_HANDLERS
+from instrumentation import span, enable_from_environment
+from core import (
+    SAVE_BATCH_SIZE, SAVE_FLUSH_INTERVAL_MS, EXPORT_FORMATS, RecordWriter, connect_database,
+    prepare_database, clear_records, count_records, save_records, migrate_to_typed, typed_columns,
+    get_indexed_variables, set_indexed_variables, load_variables, generate_analysis_report,
+    ANALYSIS_STAGES, browser_columns, IMPORT_FORMATS, import_file, write_import_errors
 )
-from PyQt6.QtCore import QDate, Qt, QRegularExpression
-from PyQt6.QtGui import QDoubleValidator, QIntValidator, QFont, QPalette, QColor, QTextCursor, \
-    QRegularExpressionValidator
-from docx import Document
 import sys
 import os
 
@@ -38,219 +28,156 @@ def resource_path(relative_path):
 
 # Désactive Kivy si présent
 os.environ['KIVY_NO_CONSOLELOG'] = '1'
-class MplCanvas(FigureCanvas):
-    """Classe pour intégrer des graphiques matplotlib dans PyQt"""
-
-    def __init__(self, parent=None, width=5, height=4, dpi=100):
-        fig = Figure(figsize=(width, height), dpi=dpi)
-        self.axes = fig.add_subplot(111)
-        super().__init__(fig)
-        self.setParent(parent)
-
-
-class Variable:
-    def __init__(self, nom, description, modalites, type_variable, taille=None):
-        self.nom = nom.strip()
-        self.description = description.strip()
-        self.modalites = self.parse_modalites(modalites)
-        self.type_variable = type_variable.strip().upper()
-        self.taille = int(taille) if taille and taille.isdigit() else None
 
-    def parse_modalites(self, modalites):
-        items = re.findall(r'(\d+)\s*[-:]?\s*([^,\n]+)', modalites)
-        return [(int(num.strip()), label.strip()) for num, label in items] if items else []
 
+class DatabaseWorker(QObject):
+    """Possède la connexion SQLite et exécute les requêtes, une à une, dans son propre thread"""
 
-class AnalysisDialog(QDialog):
-    def __init__(self, report, parent=None):
-        super().__init__(parent)
-        self.setWindowTitle("Rapport d'Analyse Exploratoire")
-        self.setMinimumSize(1000, 700)
-
-        layout = QVBoxLayout()
-
-        # Onglets pour différents types d'analyse
-        self.tabs = QTabWidget()
-
-        # Onglet Résumé
-        self.summary_tab = QWidget()
-        summary_layout = QVBoxLayout()
-        self.summary_text = QTextEdit()
-        self.summary_text.setReadOnly(True)
-        self.summary_text.setFont(QFont("Courier New", 10))
-        summary_layout.addWidget(self.summary_text)
-        self.summary_tab.setLayout(summary_layout)
-        self.tabs.addTab(self.summary_tab, "Résumé")
-
-        # Onglet Données Manquantes (seulement le tableau)
-        self.missing_tab = QWidget()
-        missing_layout = QVBoxLayout()
-
-        # Tableau pour les données manquantes
-        self.missing_table = QTableWidget()
-        self.missing_table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
-        missing_layout.addWidget(self.missing_table)
-
-        self.missing_tab.setLayout(missing_layout)
-        self.tabs.addTab(self.missing_tab, "Données Manquantes")
-
-        # Onglet Distributions Numériques
-        self.dist_tab = QWidget()
-        dist_layout = QVBoxLayout()
-
-        # Sélecteur de variable numérique
-        self.numeric_var_selector = QComboBox()
-        dist_layout.addWidget(QLabel("Sélectionnez une variable numérique:"))
-        dist_layout.addWidget(self.numeric_var_selector)
-
-        # Conteneur pour les graphiques
-        self.dist_graph_container = QWidget()
-        self.dist_graph_layout = QGridLayout()
-        self.dist_graph_container.setLayout(self.dist_graph_layout)
-
-        dist_layout.addWidget(self.dist_graph_container)
-        self.dist_tab.setLayout(dist_layout)
-        self.tabs.addTab(self.dist_tab, "Distributions Numériques")
-
-        # Onglet Tests de Normalité
-        self.normality_tab = QWidget()
-        normality_layout = QVBoxLayout()
-        self.normality_table = QTableWidget()
-        self.normality_table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
-        normality_layout.addWidget(self.normality_table)
-        self.normality_tab.setLayout(normality_layout)
-        self.tabs.addTab(self.normality_tab, "Tests de Normalité")
-
-        layout.addWidget(self.tabs)
-
-        # Bouton Fermer
-        btn_close = QPushButton("Fermer")
-        btn_close.clicked.connect(self.accept)
-        btn_close.setStyleSheet("background-color: #4267B2; color: white;")
-        layout.addWidget(btn_close)
-
-        self.setLayout(layout)
+    requested = pyqtSignal(int, object, tuple)
+    finished = pyqtSignal(int, object)
+    failed = pyqtSignal(int, object)
 
-        # Afficher le rapport
-        self.display_report(report)
-
-    def display_report(self, report):
-        # Afficher le résumé
-        self.summary_text.setPlainText(report['summary'])
+    def __init__(self):
+        super().__init__()
+        self.db = None
+        # Connexion mise en file : run s'exécute dans le thread du worker
+        self.requested.connect(self.run)
 
-        # Afficher les données manquantes dans un tableau
-        self.display_missing_table(report['missing_data'])
+    @pyqtSlot(int, object, tuple)
+    def run(self, request_id, task, args):
+        try:
+            result = task(self, *args)
+        except Exception as e:
+            self.failed.emit(request_id, e)
+        else:
+            self.finished.emit(request_id, result)
 
-        # Afficher les distributions numériques
-        self.setup_numeric_vars(report['numeric_vars'])
 
-        # Afficher les tests de normalité
-        self.display_normality_tests(report['normality_tests'])
+def _open_task(worker, path, prepare, *args):
+    if worker.db:
+        worker.db.close()
+        worker.db = None
+    worker.db = connect_database(path)
+    return prepare(worker.db, *args)
 
-    def display_missing_table(self, missing_data):
-        """Affiche les données manquantes dans un tableau"""
-        if not missing_data:
-            return
 
-        # Afficher les données dans un tableau
-        self.missing_table.setRowCount(len(missing_data))
-        self.missing_table.setColumnCount(4)
-        self.missing_table.setHorizontalHeaderLabels(["Variable", "% Manquant", "Type", "Total Manquant"])
+def _close_task(worker):
+    if worker.db:
+        worker.db.close()
+        worker.db = None
+    QThread.currentThread().quit()
 
-        for i, (var, data) in enumerate(missing_data.items()):
-            self.missing_table.setItem(i, 0, QTableWidgetItem(var))
-            self.missing_table.setItem(i, 1, QTableWidgetItem(f"{data['percentage']:.2f}%"))
-            self.missing_table.setItem(i, 2, QTableWidgetItem(data['type']))
-            self.missing_table.setItem(i, 3, QTableWidgetItem(str(data['count'])))
 
-        self.missing_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+class DatabaseClient(QObject):
+    """File de requêtes vers le DatabaseWorker ; les réponses arrivent dans le thread de l'interface.
 
-    def setup_numeric_vars(self, numeric_vars):
-        """Configure le sélecteur de variables numériques"""
-        self.numeric_var_selector.clear()
-        self.numeric_vars = numeric_vars
+    Les requêtes sont exécutées dans l'ordre d'envoi. Chaque fonction reçoit la connexion
+    en premier argument : submit(save_records, mode, variables, records, on_done=...).
+    """
 
-        for var in numeric_vars.keys():
-            self.numeric_var_selector.addItem(var)
+    # Avancement émis depuis le thread base de données par les tâches longues
+    progress = pyqtSignal(int)
+    # Avancement par étape (indice de l'étape, fait, total), pour l'analyse
+    stage_progress = pyqtSignal(int, int, int)
+    # Erreur d'une requête envoyée sans on_error
+    unhandled_error = pyqtSignal(object)
 
-        if numeric_vars:
-            self.numeric_var_selector.currentIndexChanged.connect(self.plot_numeric_distribution)
-            self.plot_numeric_distribution(0)
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.callbacks = {}
+        self.next_request_id = 0
+
+        self.thread = QThread()
+        self.worker = DatabaseWorker()
+        self.worker.moveToThread(self.thread)
+        self.worker.finished.connect(self.on_finished)
+        self.worker.failed.connect(self.on_failed)
+        self.thread.start()
+
+    def submit(self, fn, *args, on_done=None, on_error=None, cancel=None):
+        """Met fn(connexion, *args) en file ; retourne l'identifiant de la requête.
+
+        cancel (threading.Event) est déclenché si le client s'arrête avant la fin de la requête.
+        """
+        return self.send(lambda worker, *a: fn(worker.db, *a), args, on_done, on_error, cancel)
+
+    def open(self, path, prepare, *args, on_done=None, on_error=None):
+        """Ouvre path dans le thread base de données puis appelle prepare(connexion, *args)"""
+        return self.send(_open_task, (path, prepare) + args, on_done, on_error)
+
+    def send(self, task, args, on_done, on_error, cancel=None):
+        self.next_request_id += 1
+        self.callbacks[self.next_request_id] = (on_done, on_error, cancel)
+        self.worker.requested.emit(self.next_request_id, task, args)
+        return self.next_request_id
+
+    def is_busy(self):
+        return bool(self.callbacks)
+
+    @pyqtSlot(int, object)
+    def on_finished(self, request_id, result):
+        on_done, _, _ = self.callbacks.pop(request_id)
+        if on_done:
+            on_done(result)
+
+    @pyqtSlot(int, object)
+    def on_failed(self, request_id, error):
+        _, on_error, _ = self.callbacks.pop(request_id)
+        if on_error:
+            on_error(error)
+        else:
+            self.unhandled_error.emit(error)
 
-    def plot_numeric_distribution(self, index):
-        """Affiche les graphiques pour la variable numérique sélectionnée"""
-        var_name = self.numeric_var_selector.currentText()
-        if not var_name or not self.numeric_vars:
-            return
+    def shutdown(self):
+        """Interrompt les tâches longues, termine les requêtes en file, ferme la connexion et arrête le thread"""
+        if self.thread.isRunning():
+            for _, _, cancel in self.callbacks.values():
+                if cancel is not None:
+                    cancel.set()
+            self.send(_close_task, (), None, None)
+            self.thread.wait()
 
-        # Récupérer les données de la variable
-        data = self.numeric_vars[var_name]
-        values = data['values']
-
-        # Effacer les graphiques précédents
-        for i in reversed(range(self.dist_graph_layout.count())):
-            widget = self.dist_graph_layout.itemAt(i).widget()
-            if widget:
-                widget.deleteLater()
-
-        # Créer les graphiques
-        # Boxplot
-        boxplot_canvas = MplCanvas(self, width=5, height=4, dpi=100)
-        ax_box = boxplot_canvas.axes
-        ax_box.boxplot(values.dropna(), vert=False)
-        ax_box.set_title(f'Boxplot de {var_name}')
-        ax_box.set_xlabel('Valeurs')
-        ax_box.grid(axis='x', linestyle='--', alpha=0.7)
-
-        # Histogramme
-        hist_canvas = MplCanvas(self, width=5, height=4, dpi=100)
-        ax_hist = hist_canvas.axes
-        ax_hist.hist(values.dropna(), bins=20, color='#3498db', edgecolor='black')
-        ax_hist.set_title(f'Distribution de {var_name}')
-        ax_hist.set_xlabel('Valeurs')
-        ax_hist.set_ylabel('Fréquence')
-        ax_hist.grid(axis='y', linestyle='--', alpha=0.7)
-
-        # QQ Plot
-        qq_canvas = MplCanvas(self, width=5, height=4, dpi=100)
-        ax_qq = qq_canvas.axes
-        stats.probplot(values.dropna(), dist="norm", plot=ax_qq)
-        ax_qq.set_title(f'QQ Plot de {var_name}')
-        ax_qq.grid(True, linestyle='--', alpha=0.7)
-
-        # Ajouter les graphiques au layout
-        self.dist_graph_layout.addWidget(boxplot_canvas, 0, 0)
-        self.dist_graph_layout.addWidget(hist_canvas, 0, 1)
-        self.dist_graph_layout.addWidget(qq_canvas, 1, 0, 1, 2)
-
-    def display_normality_tests(self, normality_tests):
-        """Affiche les résultats des tests de normalité dans un tableau"""
-        if not normality_tests:
-            return
 
-        self.normality_table.setRowCount(len(normality_tests))
-        self.normality_table.setColumnCount(5)
-        self.normality_table.setHorizontalHeaderLabels([
-            "Variable", "Shapiro-Wilk (p-value)", "Normalité (Shapiro)",
-            "Kolmogorov-Smirnov (p-value)", "Normalité (KS)"
-        ])
+class IndexedVariablesDialog(QDialog):
+    """Choix des variables à indexer dans la base"""
 
-        for i, (var, tests) in enumerate(normality_tests.items()):
-            self.normality_table.setItem(i, 0, QTableWidgetItem(var))
+    def __init__(self, keys, selected, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Variables indexées")
+        self.setMinimumSize(400, 500)
 
-            # Shapiro-Wilk
-            shapiro_p = tests.get('shapiro_p', np.nan)
-            shapiro_norm = "Oui" if shapiro_p > 0.05 else "Non"
-            self.normality_table.setItem(i, 1, QTableWidgetItem(f"{shapiro_p:.4f}"))
-            self.normality_table.setItem(i, 2, QTableWidgetItem(shapiro_norm))
+        layout = QVBoxLayout()
+        layout.addWidget(QLabel("Cochez les variables utilisées pour les recherches (identifiants, dates...) :"))
+
+        container = QWidget()
+        container_layout = QVBoxLayout()
+        self.checkboxes = []
+        for key in keys:
+            checkbox = QCheckBox(key)
+            checkbox.setChecked(key in selected)
+            self.checkboxes.append(checkbox)
+            container_layout.addWidget(checkbox)
+        container_layout.addStretch()
+        container.setLayout(container_layout)
+
+        scroll = QScrollArea()
+        scroll.setWidgetResizable(True)
+        scroll.setWidget(container)
+        layout.addWidget(scroll)
+
+        buttons_layout = QHBoxLayout()
+        btn_ok = QPushButton("Valider")
+        btn_ok.clicked.connect(self.accept)
+        btn_cancel = QPushButton("Annuler")
+        btn_cancel.clicked.connect(self.reject)
+        buttons_layout.addWidget(btn_ok)
+        buttons_layout.addWidget(btn_cancel)
+        layout.addLayout(buttons_layout)
 
-            # Kolmogorov-Smirnov
-            ks_p = tests.get('ks_p', np.nan)
-            ks_norm = "Oui" if ks_p > 0.05 else "Non"
-            self.normality_table.setItem(i, 3, QTableWidgetItem(f"{ks_p:.4f}"))
-            self.normality_table.setItem(i, 4, QTableWidgetItem(ks_norm))
+        self.setLayout(layout)
 
-        self.normality_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+    def selected_keys(self):
+        return [checkbox.text() for checkbox in self.checkboxes if checkbox.isChecked()]
 
 
 class ExDForm(QMainWindow):
@@ -259,9 +186,15 @@ class ExDForm(QMainWindow):
         self.setWindowTitle("ExDForm")
         self.variables = []
         self.inputs = {}
-        self.modality_names = {}
-        self.db = None
+        self.fields = []  # [(gestionnaire, variable, saisie)] dans l'ordre du formulaire
+        self.db_client = DatabaseClient(self)
+        self.db_client.unhandled_error.connect(
+            lambda error: self.show_database_error(error, "Erreur de base de données"))
         self.current_db_path = None
+        self.storage_mode = "json"
+        self.record_writer = None
+        self.performance_panel = None
+        self.save_pending = False  # Enregistrement envoyé au thread base de données, pas encore écrit
 
         # Appliquer un style global
         self.setStyleSheet("""
@@ -396,12 +329,26 @@ class ExDForm(QMainWindow):
         btn_reset_db.clicked.connect(self.reset_database)
         btn_reset_db.setStyleSheet("background-color: #e74c3c;")
 
+        btn_convert_db = QPushButton("Convertir en stockage typé")
+        btn_convert_db.setIcon(self.style().standardIcon(QStyle.StandardPixmap.SP_ArrowRight))
+        btn_convert_db.clicked.connect(self.convert_to_typed_storage)
+
         db_buttons_layout.addWidget(btn_new_db)
         db_buttons_layout.addWidget(btn_open_db)
         db_buttons_layout.addWidget(btn_reset_db)
+        db_buttons_layout.addWidget(btn_convert_db)
+
+        btn_index_db = QPushButton("Variables indexées")
+        btn_index_db.setIcon(self.style().standardIcon(QStyle.StandardPixmap.SP_FileDialogListView))
+        btn_index_db.clicked.connect(self.configure_indexed_variables)
+        db_buttons_layout.addWidget(btn_index_db)
+
+        # Option de stockage pour les nouvelles bases
+        self.typed_storage_checkbox = QCheckBox("Nouvelles bases en stockage typé (une colonne SQL par variable)")
 
         db_layout.addWidget(self.current_db_label)
         db_layout.addLayout(db_buttons_layout)
+        db_layout.addWidget(self.typed_storage_checkbox)
         db_group.setLayout(db_layout)
         main_layout.addWidget(db_group)
 
@@ -414,14 +361,14 @@ class ExDForm(QMainWindow):
         btn_import.setIcon(self.style().standardIcon(QStyle.StandardPixmap.SP_FileDialogContentsView))
         btn_import.clicked.connect(self.import_docx)
 
-        btn_save = QPushButton("Enregistrer dans la base")
-        btn_save.setIcon(self.style().standardIcon(QStyle.StandardPixmap.SP_DialogSaveButton))
-        btn_save.clicked.connect(self.save_data)
-        btn_save.setStyleSheet("background-color: #27ae60;")
+        self.btn_save = QPushButton("Enregistrer dans la base")
+        self.btn_save.setIcon(self.style().standardIcon(QStyle.StandardPixmap.SP_DialogSaveButton))
+        self.btn_save.clicked.connect(self.save_data)
+        self.btn_save.setStyleSheet("background-color: #27ae60;")
 
-        btn_export = QPushButton("Exporter en CSV")
+        btn_export = QPushButton("Exporter les données")
         btn_export.setIcon(self.style().standardIcon(QStyle.StandardPixmap.SP_ArrowDown))
-        btn_export.clicked.connect(self.export_csv)
+        btn_export.clicked.connect(self.export_data)
         btn_export.setStyleSheet("background-color: #2c3e50;")
 
         # Nouveau bouton pour l'analyse exploratoire
@@ -430,13 +377,37 @@ class ExDForm(QMainWindow):
         btn_analysis.clicked.connect(self.show_exploratory_analysis)
         btn_analysis.setStyleSheet("background-color: #9b59b6;")
 
+        btn_import_data = QPushButton("Importer des données")
+        btn_import_data.setIcon(self.style().standardIcon(QStyle.StandardPixmap.SP_ArrowUp))
+        btn_import_data.clicked.connect(self.import_data)
+        btn_import_data.setStyleSheet("background-color: #2c3e50;")
+
+        btn_browse = QPushButton("Parcourir les données")
+        btn_browse.setIcon(self.style().standardIcon(QStyle.StandardPixmap.SP_FileDialogListView))
+        btn_browse.clicked.connect(self.browse_records)
+        btn_browse.setStyleSheet("background-color: #16a085;")
+
         func_buttons_layout = QHBoxLayout()
         func_buttons_layout.addWidget(btn_import)
-        func_buttons_layout.addWidget(btn_save)
+        func_buttons_layout.addWidget(self.btn_save)
         func_buttons_layout.addWidget(btn_export)
+        func_buttons_layout.addWidget(btn_import_data)
         func_buttons_layout.addWidget(btn_analysis)
+        func_buttons_layout.addWidget(btn_browse)
+
+        # Option d'enregistrement groupé pour les sessions de saisie intensives
+        self.batch_save_checkbox = QCheckBox(
+            f"Enregistrement groupé (écriture par lots de {SAVE_BATCH_SIZE} ou toutes les "
+            f"{SAVE_FLUSH_INTERVAL_MS // 1000} s)")
+        self.batch_save_checkbox.toggled.connect(self.toggle_batch_save)
+
+        self.flush_timer = QTimer(self)
+        self.flush_timer.setInterval(SAVE_FLUSH_INTERVAL_MS)
+        self.flush_timer.timeout.connect(self.flush_pending_records)
+        self.flush_timer.start()
 
         func_layout.addLayout(func_buttons_layout)
+        func_layout.addWidget(self.batch_save_checkbox)
         func_group.setLayout(func_layout)
         main_layout.addWidget(func_group)
 
@@ -473,7 +444,13 @@ class ExDForm(QMainWindow):
         self.status_label.setStyleSheet("color: white;")
         self.status_label.setAlignment(Qt.AlignmentFlag.AlignLeft)
 
+        btn_performance = QPushButton("Performances")
+        btn_performance.setStyleSheet("background-color: transparent; border: 1px solid white; padding: 2px 8px;")
+        btn_performance.clicked.connect(self.show_performance_panel)
+
         status_layout.addWidget(self.status_label)
+        status_layout.addStretch()
+        status_layout.addWidget(btn_performance)
         status_bar.setLayout(status_layout)
         main_layout.addWidget(status_bar)
 
@@ -481,17 +458,72 @@ class ExDForm(QMainWindow):
         self.setCentralWidget(main_widget)
 
     def update_status(self, message):
+        # Les accès à la base se font dans un thread dédié : un simple rafraîchissement suffit
         self.status_label.setText(message)
-        QApplication.processEvents()
+        self.status_label.repaint()
 
-    def connect_to_database(self, path):
-        if self.db:
-            self.db.close()
-        self.db = sqlite3.connect(path)
-        self.current_db_path = path
-        self.create_table()
-        self.current_db_label.setText(f"Base de données actuelle : {self.current_db_path}")
-        self.update_status(f"Base de données connectée: {path}")
+    def flush_pending_records(self, discard=False):
+        """Envoie au thread base de données (ou abandonne) les enregistrements du lot courant"""
+        if self.record_writer is None:
+            return
+        if discard:
+            self.record_writer.pending = []
+        else:
+            self.record_writer.flush()
+        self.record_writer = None
+
+    def write_batch(self, records):
+        """Écriture asynchrone d'un lot ; les enregistrements sont remis en attente en cas d'échec"""
+        def on_done(count):
+            self.update_status(f"Lot de {count} enregistrement(s) écrit dans la base")
+
+        def on_error(error):
+            if self.record_writer is None:
+                self.record_writer = RecordWriter(self.write_batch)
+            self.record_writer.pending[:0] = records
+            self.show_database_error(error, "Erreur lors de l'enregistrement")
+
+        self.db_client.submit(save_records, self.storage_mode, list(self.variables), records,
+                              on_done=on_done, on_error=on_error)
+
+    def show_database_error(self, error, status):
+        QMessageBox.critical(self, "Erreur", f"Erreur de base de données : {str(error)}")
+        self.update_status(status)
+
+    def toggle_batch_save(self, checked):
+        if not checked:
+            self.flush_pending_records()
+
+    def closeEvent(self, event):
+        # Les requêtes déjà en file (dont le dernier lot) sont exécutées avant la fermeture
+        self.flush_pending_records()
+        self.db_client.shutdown()
+        super().closeEvent(event)
+
+    def connect_to_database(self, path, typed_if_empty=False, message=None):
+        self.flush_pending_records()
+        self.update_status(f"Connexion à la base: {path}...")
+
+        def on_connected(result):
+            mode, variables = result
+            self.current_db_path = path
+            self.storage_mode = mode
+            if [var.to_dict() for var in variables] != [var.to_dict() for var in self.variables]:
+                # Le tableau de variables enregistré dans la base prime sur celui déjà chargé
+                self.variables = variables
+                self.generate_form()
+            self.current_db_label.setText(f"Base de données actuelle : {self.current_db_path}")
+            self.update_status(f"Base de données connectée: {path}")
+            if message:
+                QMessageBox.information(self, "Succès", message)
+
+        def on_error(error):
+            self.current_db_path = None
+            self.current_db_label.setText("Base de données actuelle : Aucune")
+            self.show_database_error(error, "Erreur lors de la connexion")
+
+        self.db_client.open(path, prepare_database, list(self.variables), typed_if_empty,
+                            on_done=on_connected, on_error=on_error)
 
     def new_database(self):
         file_path, _ = QFileDialog.getSaveFileName(
@@ -503,9 +535,8 @@ class ExDForm(QMainWindow):
         if file_path:
             if not file_path.lower().endswith(('.db', '.sqlite')):
                 file_path += '.db'
-            self.connect_to_database(file_path)
-            QMessageBox.information(self, "Succès", f"Nouvelle base de données créée : {file_path}")
-            self.update_status(f"Base créée: {file_path}")
+            self.connect_to_database(file_path, typed_if_empty=self.typed_storage_checkbox.isChecked(),
+                                     message=f"Nouvelle base de données créée : {file_path}")
 
     def open_database(self):
         file_path, _ = QFileDialog.getOpenFileName(
@@ -515,12 +546,10 @@ class ExDForm(QMainWindow):
             "Fichiers SQLite (*.db *.sqlite)"
         )
         if file_path:
-            self.connect_to_database(file_path)
-            QMessageBox.information(self, "Succès", f"Base de données ouverte : {file_path}")
-            self.update_status(f"Base ouverte: {file_path}")
+            self.connect_to_database(file_path, message=f"Base de données ouverte : {file_path}")
 
     def reset_database(self):
-        if self.db:
+        if self.current_db_path:
             reply = QMessageBox.question(
                 self,
                 'Confirmer',
@@ -528,71 +557,94 @@ class ExDForm(QMainWindow):
                 QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
             )
             if reply == QMessageBox.StandardButton.Yes:
-                cursor = self.db.cursor()
-                cursor.execute("DELETE FROM data")
-                self.db.commit()
-                QMessageBox.information(self, "Succès", "Base de données réinitialisée.")
-                self.update_status("Base réinitialisée")
+                self.flush_pending_records(discard=True)
+
+                def on_done(_):
+                    QMessageBox.information(self, "Succès", "Base de données réinitialisée.")
+                    self.update_status("Base réinitialisée")
+
+                self.update_status("Réinitialisation de la base...")
+                self.db_client.submit(clear_records, on_done=on_done,
+                                      on_error=lambda e: self.show_database_error(e, "Erreur lors de la réinitialisation"))
         else:
             QMessageBox.warning(self, "Avertissement", "Aucune base de données n'est ouverte.")
             self.update_status("Erreur: aucune base ouverte")
 
-    def create_table(self):
-        if self.db:
-            cursor = self.db.cursor()
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS data (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    form_data TEXT
-                )
-            """)
-            self.db.commit()
+    def configure_indexed_variables(self):
+        """Déclare les variables indexées de la base ouverte"""
+        if not self.current_db_path:
+            QMessageBox.warning(self, "Avertissement", "Aucune base de données n'est ouverte.")
+            self.update_status("Erreur: aucune base ouverte")
+            return
+
+        def choose(selected):
+            keys = [name for name, _ in typed_columns(self.variables)]
+            keys += [key for key in selected if key not in keys]
+            if not keys:
+                QMessageBox.warning(self, "Avertissement", "Importez d'abord un tableau de variables.")
+                return
+
+            dialog = IndexedVariablesDialog(keys, selected, self)
+            if dialog.exec():
+                chosen = dialog.selected_keys()
+                self.update_status("Création des index...")
+                self.db_client.submit(
+                    set_indexed_variables, self.storage_mode, list(self.variables), chosen,
+                    on_done=lambda _: self.update_status(f"{len(chosen)} variable(s) indexée(s)"),
+                    on_error=lambda e: self.show_database_error(e, "Erreur lors de la création des index"))
+
+        self.db_client.submit(get_indexed_variables, on_done=choose,
+                              on_error=lambda e: self.show_database_error(e, "Erreur de lecture des index"))
+
+    def convert_to_typed_storage(self):
+        """Migre la base JSON ouverte vers le stockage typé"""
+        if not self.current_db_path:
+            QMessageBox.warning(self, "Avertissement", "Aucune base de données n'est ouverte.")
+            self.update_status("Erreur: aucune base ouverte")
+            return
+        if self.storage_mode == "typed":
+            QMessageBox.information(self, "Information", "La base utilise déjà le stockage typé.")
+            return
+        if not self.variables:
+            QMessageBox.warning(self, "Avertissement",
+                                "Importez d'abord le tableau de variables correspondant à cette base.")
+            return
+
+        self.flush_pending_records()
+
+        def on_done(count):
+            self.storage_mode = "typed"
+            QMessageBox.information(self, "Succès", f"{count} enregistrement(s) convertis en stockage typé.")
+            self.update_status("Base convertie en stockage typé")
+
+        def on_error(error):
+            QMessageBox.critical(self, "Erreur", f"Erreur lors de la conversion : {str(error)}")
+            self.update_status("Erreur lors de la conversion")
+
+        self.update_status("Conversion en stockage typé...")
+        self.db_client.submit(migrate_to_typed, list(self.variables), on_done=on_done, on_error=on_error)
 
     def import_docx(self):
         file_path, _ = QFileDialog.getOpenFileName(self, "Choisir un fichier Word", "", "Documents Word (*.docx)")
         if file_path:
+            self.flush_pending_records()
             self.variables = self.read_variables_from_docx(file_path)
+            if self.current_db_path:
+                # Enregistre le nouveau schéma dans la base et aligne la table typée et les index
+                self.db_client.submit(prepare_database, list(self.variables), False, True,
+                                      os.path.basename(file_path),
+                                      on_error=lambda e: self.show_database_error(e, "Erreur de préparation de la base"))
             self.generate_form()
             self.update_status(f"Fichier importé: {file_path.split('/')[-1]}")
 
     def read_variables_from_docx(self, file_path):
-        doc = Document(file_path)
-        vars = []
-        for table in doc.tables:
-            # Vérifier si la table a au moins 5 colonnes (nouveau format)
-            if len(table.rows) > 0 and len(table.rows[0].cells) >= 5:
-                for row in table.rows[1:]:
-                    cells = row.cells
-                    if len(cells) >= 5:
-                        nom = cells[0].text
-                        description = cells[1].text
-                        modalites = cells[2].text
-                        type_variable = cells[3].text
-                        taille = cells[4].text  # Nouvelle colonne pour la taille
-
-                        # Handle multi-line modalities by replacing newlines with commas
-                        modalites = modalites.replace('\n', ', ')
-
-                        if type_variable.strip().upper() != "ID":
-                            vars.append(Variable(nom, description, modalites, type_variable, taille))
-            else:
-                # Ancien format sans colonne de taille
-                for row in table.rows[1:]:
-                    cells = row.cells
-                    if len(cells) >= 4:
-                        nom = cells[0].text
-                        description = cells[1].text
-                        modalites = cells[2].text
-                        type_variable = cells[3].text
-
-                        # Handle multi-line modalities by replacing newlines with commas
-                        modalites = modalites.replace('\n', ', ')
-
-                        if type_variable.strip().upper() != "ID":
-                            vars.append(Variable(nom, description, modalites, type_variable))
-        return vars
+        return load_variables(file_path)
 
     def generate_form(self):
+        with span("Génération du formulaire", rows=len(self.variables)):
+            self.build_form()
+
+    def build_form(self):
         # Supprimer les anciens widgets
         while self.form_layout.count():
             child = self.form_layout.takeAt(0)
@@ -600,7 +652,7 @@ class ExDForm(QMainWindow):
                 child.widget().deleteLater()
 
         self.inputs.clear()
-        self.modality_names = {}
+        self.fields = []
 
         if not self.variables:
             no_vars_label = QLabel("Aucune variable importée. Veuillez importer un fichier Word.")
@@ -615,100 +667,36 @@ class ExDForm(QMainWindow):
             group_layout.setVerticalSpacing(10)
             group_layout.setHorizontalSpacing(15)
 
-            if var.type_variable == "NUM_CONTINUE":
-                input_field = QLineEdit()
-                # Validateur pour nombres à virgule flottante (point décimal)
-                validator = QDoubleValidator()
-                validator.setNotation(QDoubleValidator.Notation.StandardNotation)
-                input_field.setValidator(validator)
-                input_field.setPlaceholderText("Entrez un nombre décimal (ex: 12.34)")
-
-                # Ajouter le contrôle de taille si disponible
-                if var.taille:
-                    input_field.setMaxLength(var.taille)
-
-                self.inputs[var.nom] = input_field
-                group_layout.addRow(QLabel("Valeur:"), input_field)
-
-            elif var.type_variable == "NUM_DISCRETE":
-                input_field = QLineEdit()
-                # Validateur pour nombres entiers
-                validator = QIntValidator()
-                input_field.setValidator(validator)
-                input_field.setPlaceholderText("Entrez un nombre entier")
-
-                # Ajouter le contrôle de taille si disponible
-                if var.taille:
-                    input_field.setMaxLength(var.taille)
-
-                self.inputs[var.nom] = input_field
-                group_layout.addRow(QLabel("Valeur:"), input_field)
-
-            elif var.type_variable == "TEXTE":
-                input_field = QLineEdit()
-                input_field.setPlaceholderText("Entrez du texte")
-
-                # Ajouter le contrôle de taille si disponible
-                if var.taille:
-                    input_field.setMaxLength(var.taille)
-
-                self.inputs[var.nom] = input_field
-                group_layout.addRow(QLabel("Valeur:"), input_field)
-
-            elif var.type_variable == "BINAIRE":
-                combo = QComboBox()
-                combo.addItems(["1 (Oui)", "0 (Non)"])
-                self.inputs[var.nom] = combo
-                group_layout.addRow(QLabel("Sélection:"), combo)
-
-            elif var.type_variable == "CATEGORIELLE":
-                combo = QComboBox()
-                combo.addItem("-- Sélectionnez une option --", "")
-                for num, label_mod in var.modalites:
-                    combo.addItem(f"{num} - {label_mod}", num)
-                self.inputs[var.nom] = combo
-                group_layout.addRow(QLabel("Sélection:"), combo)
-
-            elif var.type_variable == "CATEGORIELLE_MULTIPLE":
-                # MODIFICATION: Utiliser des combobox au lieu de checkbox
-                for num, mod in var.modalites:
-                    combo = QComboBox()
-                    combo.addItem("-- Sélectionnez --", "")  # Valeur vide par défaut
-                    combo.addItem("1 (Oui)", 1)
-                    combo.addItem("0 (Non)", 0)
-
-                    unique_id = f"{var.nom}_{num}"
-                    self.modality_names[unique_id] = mod
-                    if var.nom not in self.inputs:
-                        self.inputs[var.nom] = []
-                    self.inputs[var.nom].append((unique_id, combo))
-                    group_layout.addRow(QLabel(f"{mod}:"), combo)
-
-            elif var.type_variable == "DATE":
-                date_edit = QDateEdit()
-                date_edit.setCalendarPopup(True)
-                date_edit.setDate(QDate.currentDate())
-                date_edit.setDisplayFormat("dd/MM/yyyy")
-                self.inputs[var.nom] = date_edit
-                group_layout.addRow(QLabel("Date:"), date_edit)
-
-            elif var.type_variable == "TEMPS":
-                time_field = QLineEdit()
-                # Validateur pour le format hh:mm:ss
-                regex = QRegularExpression("^([0-1][0-9]|2[0-3]):[0-5][0-9]:[0-5][0-9]$")
-                validator = QRegularExpressionValidator(regex)
-                time_field.setValidator(validator)
-                time_field.setPlaceholderText("hh:mm:ss")
-                self.inputs[var.nom] = time_field
-                group_layout.addRow(QLabel("Heure:"), time_field)
+            # Gestionnaire résolu une fois par schéma : save_data et reset_form parcourent self.fields
+            handler = FIELD_HANDLERS.get(var.type_variable)
+            if handler is not None:
+                widget = handler.build(var, group_layout)
+                self.inputs[var.nom] = widget
+                self.fields.append((handler, var, widget))
 
             group.setLayout(group_layout)
             self.form_layout.addRow(group)
 
         # Installer un event filter pour la navigation avec Entrée
-        for widget in self.findChildren(QLineEdit) + self.findChildren(QComboBox) + self.findChildren(QDateEdit):
+        container = self.form_container
+        for widget in container.findChildren(QLineEdit) + container.findChildren(QComboBox) + \
+                container.findChildren(QDateEdit):
             widget.installEventFilter(self)
 
+    def reset_form(self):
+        """Vide le formulaire pour l'enregistrement suivant sans recréer les widgets"""
+        first_widget = None
+        with span("Remise à zéro du formulaire", rows=len(self.fields)):
+            for handler, _, widget in self.fields:
+                handler.reset(widget)
+                if first_widget is None:
+                    first_widget = handler.first_widget(widget)
+
+        # Retour en haut du formulaire, curseur sur le premier champ
+        self.form_area.verticalScrollBar().setValue(0)
+        if first_widget is not None:
+            first_widget.setFocus()
+
     def eventFilter(self, obj, event):
         # Seulement pour les événements clavier sur les widgets d'entrée
         if (event.type() == event.Type.KeyPress and
@@ -730,7 +718,10 @@ class ExDForm(QMainWindow):
         return super().eventFilter(obj, event)
 
     def save_data(self):
-        if not self.db:
+        if self.save_pending:
+            # Un second clic pendant l'écriture dupliquerait l'enregistrement
+            return
+        if not self.current_db_path:
             QMessageBox.warning(self, "Erreur", "Veuillez d'abord créer ou ouvrir une base de données.")
             self.update_status("Erreur: aucune base de données ouverte")
             return
@@ -739,65 +730,9 @@ class ExDForm(QMainWindow):
         error_fields = []
         self.update_status("Validation des données...")
 
-        for var in self.variables:
-            if var.type_variable == "NUM_CONTINUE":
-                field = self.inputs[var.nom]
-                value = field.text().strip()
-
-                if value:
-                    # Vérifier le séparateur décimal
-                    if ',' in value:
-                        error_fields.append(f"{var.nom}: Utilisez le point (.) comme séparateur décimal")
-                        field.setStyleSheet("border: 1px solid red;")
-                    else:
-                        try:
-                            # Convertir en float pour vérifier
-                            float_value = float(value)
-                            data[var.nom] = value
-                            field.setStyleSheet("")
-                        except ValueError:
-                            error_fields.append(f"{var.nom}: Valeur numérique invalide")
-                            field.setStyleSheet("border: 1px solid red;")
-                else:
-                    # Champ vide accepté
-                    data[var.nom] = value
-                    field.setStyleSheet("")
-
-            elif var.type_variable == "NUM_DISCRETE":
-                field = self.inputs[var.nom]
-                value = field.text().strip()
-                try:
-                    if value:  # Allow empty fields
-                        int(value)
-                    data[var.nom] = value
-                    field.setStyleSheet("")
-                except ValueError:
-                    error_fields.append(f"{var.nom}: Doit être un nombre entier")
-                    field.setStyleSheet("border: 1px solid red;")
-
-            elif var.type_variable == "TEXTE":
-                data[var.nom] = self.inputs[var.nom].text().strip()
-
-            elif var.type_variable == "BINAIRE":
-                data[var.nom] = 1 if "1" in self.inputs[var.nom].currentText() else 0
-
-            elif var.type_variable == "CATEGORIELLE":
-                data[var.nom] = self.inputs[var.nom].currentData()
-
-            elif var.type_variable == "DATE":
-                data[var.nom] = self.inputs[var.nom].date().toString("yyyy-MM-dd")
-
-            elif var.type_variable == "TEMPS":
-                data[var.nom] = self.inputs[var.nom].text().strip()
-
-            elif var.type_variable == "CATEGORIELLE_MULTIPLE":
-                for unique_id, combobox in self.inputs[var.nom]:
-                    modalite_name = self.modality_names[unique_id]
-                    # Récupérer la valeur sélectionnée (peut être vide, 1 ou 0)
-                    value = combobox.currentData()
-                    if value != "":
-                        data[modalite_name] = value
-                    # Si rien n'est sélectionné, la clé n'est pas ajoutée (reste vide dans la base)
+        with span("Validation du formulaire", rows=len(self.fields)):
+            for handler, var, widget in self.fields:
+                handler.read(var, widget, data, error_fields)
 
         # Vérifier s'il y a des erreurs
         if error_fields:
@@ -808,199 +743,278 @@ class ExDForm(QMainWindow):
             self.update_status("Erreurs dans le formulaire")
             return
 
-        try:
-            cursor = self.db.cursor()
-            cursor.execute("INSERT INTO data (form_data) VALUES (?)", (json.dumps(data),))
-            self.db.commit()
+        if self.batch_save_checkbox.isChecked():
+            if self.record_writer is None:
+                self.record_writer = RecordWriter(self.write_batch)
+            pending = len(self.record_writer.pending) + 1
+            if self.record_writer.add(data):
+                message = f"Écriture d'un lot de {pending} enregistrement(s)..."
+            else:
+                message = f"Enregistrement mis en attente ({pending}/{self.record_writer.batch_size})"
+            self.reset_form()  # Réinitialiser le formulaire
+            self.update_status(message)
+            return
+
+        def end_save():
+            self.save_pending = False
+            self.btn_save.setEnabled(True)
+
+        def on_saved(_):
+            end_save()
             QMessageBox.information(self, "Succès", "Données enregistrées avec succès.")
-            self.generate_form()  # Réinitialiser le formulaire
+            self.reset_form()  # Réinitialiser le formulaire
             self.update_status("Données enregistrées avec succès")
-        except sqlite3.Error as e:
-            QMessageBox.critical(self, "Erreur", f"Erreur de base de données : {str(e)}")
-            self.update_status("Erreur lors de l'enregistrement")
 
-    def export_csv(self):
-        if not self.db:
+        def on_error(error):
+            end_save()
+            self.show_database_error(error, "Erreur lors de l'enregistrement")
+
+        self.save_pending = True
+        self.btn_save.setEnabled(False)
+        self.update_status("Enregistrement en cours...")
+        self.db_client.submit(save_records, self.storage_mode, list(self.variables), [data],
+                              on_done=on_saved, on_error=on_error)
+
+    def export_data(self):
+        if not self.current_db_path:
             QMessageBox.warning(self, "Erreur", "Aucune base de données ouverte.")
             self.update_status("Erreur: aucune base de données ouverte")
             return
 
-        file_path, _ = QFileDialog.getSaveFileName(self, "Exporter en CSV", "", "CSV Files (*.csv)")
+        file_path, selected_filter = QFileDialog.getSaveFileName(
+            self,
+            "Exporter les données",
+            "",
+            "CSV Files (*.csv);;Excel (*.xlsx);;Parquet (*.parquet);;Feather (*.feather)"
+        )
         if file_path:
-            try:
-                self.update_status("Exportation en cours...")
-                cursor = self.db.cursor()
-                cursor.execute("SELECT id, form_data FROM data")
-                rows = cursor.fetchall()
-
-                all_data = []
-                for row in rows:
-                    d = json.loads(row[1])
-                    d["id"] = row[0]
-                    all_data.append(d)
-
-                if not all_data:
-                    QMessageBox.warning(self, "Avertissement", "Aucune donnée à exporter.")
-                    self.update_status("Aucune donnée à exporter")
-                    return
-
-                # Créer une liste ordonnée des clés basée sur l'ordre des variables
-                ordered_keys = ["id"]
-
-                # Ajouter les variables dans l'ordre de la table
-                for var in self.variables:
-                    if var.type_variable == "CATEGORIELLE_MULTIPLE":
-                        for num, mod in var.modalites:
-                            if mod in all_data[0]:
-                                ordered_keys.append(mod)
-                    else:
-                        if var.nom in all_data[0]:
-                            ordered_keys.append(var.nom)
-
-                # Ajouter les autres clés qui pourraient manquer
-                all_keys = set().union(*(d.keys() for d in all_data))
-                missing_keys = [k for k in all_keys if k not in ordered_keys and k != "id"]
-                ordered_keys.extend(sorted(missing_keys))
-
-                with open(file_path, "w", newline="", encoding="utf-8") as f:
-                    writer = csv.DictWriter(f, fieldnames=ordered_keys)
-                    writer.writeheader()
-                    for row in all_data:
-                        # S'assurer que toutes les clés sont présentes
-                        writer.writerow({k: row.get(k, "") for k in ordered_keys})
-
-                QMessageBox.information(self, "Succès", f"Exporté vers {file_path}")
-                self.update_status(f"Export réussi: {file_path}")
-            except Exception as e:
-                QMessageBox.critical(self, "Erreur", f"Erreur lors de l'export : {str(e)}")
-                self.update_status("Erreur lors de l'export")
+            extension = os.path.splitext(file_path)[1].lower()
+            if extension not in EXPORT_FORMATS:
+                # Extension déduite du filtre choisi, ex. "Excel (*.xlsx)"
+                extension = selected_filter[selected_filter.find("*") + 1:-1] if "*" in selected_filter else ".csv"
+                file_path += extension
+
+            self.flush_pending_records()
+            self.update_status("Exportation en cours...")
+            self.db_client.submit(count_records, self.storage_mode,
+                                  on_done=lambda total: self.start_export(file_path, total, EXPORT_FORMATS[extension]),
+                                  on_error=self.show_export_error)
+
+    def start_export(self, file_path, total, export_file):
+        """Lance l'export dans le thread base de données ; la fenêtre de progression n'est pas modale"""
+        if not total:
+            QMessageBox.warning(self, "Avertissement", "Aucune donnée à exporter.")
+            self.update_status("Aucune donnée à exporter")
+            return
+
+        progress = QProgressDialog("Exportation en cours...", "Annuler", 0, total, self)
+        progress.setWindowTitle("Export des données")
+        progress.setMinimumDuration(500)
+        cancel = threading.Event()
+        progress.canceled.connect(cancel.set)
+
+        def on_progress(done):
+            progress.setValue(done)
+            self.update_status(f"Exportation en cours... {done}/{total}")
+
+        # Appelée dans le thread base de données : le signal transmet l'avancement à l'interface
+        def report_progress(done):
+            self.db_client.progress.emit(done)
+            return not cancel.is_set()
+
+        def on_done(exported):
+            self.db_client.progress.disconnect(on_progress)
+            progress.close()
+            if exported is None:
+                # L'export annulé a supprimé son fichier partiel
+                self.update_status("Export annulé")
+                return
+            QMessageBox.information(self, "Succès", f"Exporté vers {file_path}")
+            self.update_status(f"Export réussi: {file_path}")
+
+        def on_error(error):
+            self.db_client.progress.disconnect(on_progress)
+            progress.close()
+            self.show_export_error(error)
+
+        self.db_client.progress.connect(on_progress)
+        self.db_client.submit(export_file, self.storage_mode, list(self.variables), file_path,
+                              report_progress, on_done=on_done, on_error=on_error, cancel=cancel)
+
+    def show_export_error(self, error):
+        QMessageBox.critical(self, "Erreur", f"Erreur lors de l'export : {str(error)}")
+        self.update_status("Erreur lors de l'export")
+
+    def import_data(self):
+        """Importe un fichier CSV ou Excel de données, validé selon le tableau de variables"""
+        if not self.current_db_path:
+            QMessageBox.warning(self, "Avertissement", "Aucune base de données n'est ouverte.")
+            self.update_status("Erreur: aucune base ouverte")
+            return
+        if not self.variables:
+            QMessageBox.warning(self, "Avertissement", "Importez d'abord le tableau de variables.")
+            return
+        file_path, _ = QFileDialog.getOpenFileName(
+            self, "Importer des données", "",
+            "Données (" + " ".join("*" + extension for extension in IMPORT_FORMATS) + ")")
+        if not file_path:
+            return
+
+        self.flush_pending_records()
+        progress = QProgressDialog("Importation en cours...", "Annuler", 0, 0, self)
+        progress.setWindowTitle("Import des données")
+        progress.setMinimumDuration(500)
+        cancel = threading.Event()
+        progress.canceled.connect(cancel.set)
+
+        def on_progress(done):
+            progress.setLabelText(f"Importation en cours... {done} ligne(s) lue(s)")
+            self.update_status(f"Importation en cours... {done} ligne(s) lue(s)")
+
+        # Appelée dans le thread base de données : le signal transmet l'avancement à l'interface
+        def report_progress(done):
+            self.db_client.progress.emit(done)
+            return not cancel.is_set()
+
+        def finish():
+            self.db_client.progress.disconnect(on_progress)
+            progress.close()
+
+        def on_done(report):
+            finish()
+            self.show_import_report(report)
+
+        def on_error(error):
+            finish()
+            QMessageBox.critical(self, "Erreur", f"Erreur lors de l'import : {str(error)}")
+            self.update_status("Erreur lors de l'import")
+
+        self.db_client.progress.connect(on_progress)
+        self.db_client.submit(import_file, self.storage_mode, list(self.variables), file_path,
+                              report_progress, on_done=on_done, on_error=on_error, cancel=cancel)
+
+    def show_import_report(self, report):
+        message = f"{report['accepted']} enregistrement(s) importé(s), {report['rejected']} ligne(s) rejetée(s)."
+        if report["cancelled"]:
+            message = "Import interrompu : " + message
+        if report["ignored"]:
+            message += f"\nColonnes ignorées : {', '.join(map(str, report['ignored']))}"
+        if report["missing"]:
+            message += f"\nColonnes absentes du fichier : {', '.join(report['missing'])}"
+        self.update_status(f"{report['accepted']} enregistrement(s) importé(s)")
+        if not report["errors"]:
+            QMessageBox.information(self, "Import terminé", message)
+            return
+
+        answer = QMessageBox.question(self, "Import terminé",
+                                      message + "\n\nEnregistrer le rapport des lignes rejetées ?")
+        if answer == QMessageBox.StandardButton.Yes:
+            file_path, _ = QFileDialog.getSaveFileName(self, "Rapport des lignes rejetées", "rejets.csv",
+                                                       "CSV (*.csv)")
+            if file_path:
+                write_import_errors(file_path, report["errors"])
+                self.update_status(f"Rapport des lignes rejetées : {file_path}")
 
     def show_exploratory_analysis(self):
         """Affiche le rapport d'analyse exploratoire"""
-        if not self.db:
+        if not self.current_db_path:
             QMessageBox.warning(self, "Erreur", "Aucune base de données ouverte.")
             self.update_status("Erreur: aucune base de données ouverte")
             return
 
+        self.flush_pending_records()
         self.update_status("Génération du rapport d'analyse...")
-        report = self.generate_analysis_report()
+
+        progress = QProgressDialog("Génération du rapport d'analyse...", "Annuler", 0, 0, self)
+        progress.setWindowTitle("Analyse exploratoire")
+        progress.setMinimumDuration(500)
+        # La fenêtre reste ouverte d'une étape à l'autre, même quand une étape est terminée
+        progress.setAutoReset(False)
+        progress.setAutoClose(False)
+        cancel = threading.Event()
+        progress.canceled.connect(cancel.set)
+
+        def on_progress(stage, done, total):
+            label = f"{ANALYSIS_STAGES[stage]}... (étape {stage + 1}/{len(ANALYSIS_STAGES)})"
+            progress.setLabelText(label)
+            progress.setMaximum(total)
+            progress.setValue(done)
+            self.update_status(label)
+
+        # Appelée dans le thread base de données : le signal transmet l'avancement à l'interface
+        def report_progress(stage, done, total):
+            self.db_client.stage_progress.emit(stage, done, total)
+            return not cancel.is_set()
+
+        def finish():
+            self.db_client.stage_progress.disconnect(on_progress)
+            progress.close()
+
+        def on_done(report):
+            finish()
+            if report is None:
+                self.update_status("Analyse annulée")
+                return
+            self.display_analysis_report(report)
+
+        def on_error(error):
+            finish()
+            self.show_database_error(error, "Erreur lors de l'analyse")
+
+        self.db_client.stage_progress.connect(on_progress)
+        self.db_client.submit(generate_analysis_report, self.storage_mode, list(self.variables),
+                              report_progress, on_done=on_done, on_error=on_error, cancel=cancel)
+
+    def browse_records(self):
+        """Ouvre la consultation paginée des enregistrements (modifiables en place)"""
+        if not self.current_db_path:
+            QMessageBox.warning(self, "Erreur", "Aucune base de données ouverte.")
+            self.update_status("Erreur: aucune base de données ouverte")
+            return
+
+        self.flush_pending_records()
+        mode, variables = self.storage_mode, list(self.variables)
+
+        def open_browser(result):
+            from record_browser import RecordBrowserDialog
+
+            columns, total = result
+            dialog = RecordBrowserDialog(self.db_client, mode, variables, columns, total, self)
+            dialog.show()
+            self.update_status(f"{total} enregistrement(s) à consulter")
+
+        self.db_client.submit(lambda db: (browser_columns(db, mode, variables), count_records(db, mode)),
+                              on_done=open_browser,
+                              on_error=lambda e: self.show_database_error(e, "Erreur de lecture des données"))
+
+    def show_performance_panel(self):
+        """Panneau des opérations mesurées ; la mesure s'y active si EXDFORM_TRACE n'est pas définie"""
+        from performance_panel import PerformancePanel
+
+        if self.performance_panel is None:
+            self.performance_panel = PerformancePanel(self)
+        self.performance_panel.show()
+        self.performance_panel.raise_()
+
+    def display_analysis_report(self, report):
         self.update_status("Rapport généré")
+        # Import différé : matplotlib et scipy ne sont chargés qu'à la première analyse
+        from analysis_dialog import AnalysisDialog
 
         # Afficher le rapport dans une fenêtre modale
         if "error" not in report:
-            analysis_dialog = AnalysisDialog(report, self)
+            analysis_dialog = AnalysisDialog(report, self, self.db_client, self.storage_mode)
             analysis_dialog.exec()
         else:
             QMessageBox.warning(self, "Erreur", report["error"])
 
-    def generate_analysis_report(self):
-        """Génère un rapport d'analyse exploratoire"""
-        if not self.db:
-            return {"error": "Aucune base de données ouverte"}
-
-        cursor = self.db.cursor()
-        cursor.execute("SELECT id, form_data FROM data")
-        rows = cursor.fetchall()
-
-        if not rows:
-            return {"error": "Aucune donnée disponible pour l'analyse"}
-
-        # Convertir les données en DataFrame pandas pour faciliter l'analyse
-        data_list = []
-        for row in rows:
-            record = json.loads(row[1])
-            record['id'] = row[0]
-            data_list.append(record)
-
-        df = pd.DataFrame(data_list)
-
-        # 1. Rapport sur les données manquantes
-        missing_data = {}
-        total_records = len(df)
-
-        for col in df.columns:
-            if col == 'id':
-                continue
-
-            missing_count = df[col].isna().sum() if col in df.columns else total_records
-            missing_percentage = (missing_count / total_records) * 100
-
-            # Déterminer le type de variable
-            var_type = "Inconnu"
-            for var in self.variables:
-                if col == var.nom or col in [self.modality_names.get(f"{var.nom}_{num}") for num, mod in var.modalites]:
-                    var_type = var.type_variable
-                    break
-
-            missing_data[col] = {
-                "count": int(missing_count),
-                "percentage": missing_percentage,
-                "type": var_type
-            }
-
-        # 2. Variables numériques pour les distributions
-        numeric_vars = {}
-        for var in self.variables:
-            if var.type_variable in ["NUM_CONTINUE", "NUM_DISCRETE"] and var.nom in df.columns:
-                # Convertir en numérique
-                df[var.nom] = pd.to_numeric(df[var.nom], errors='coerce')
-                numeric_vars[var.nom] = {
-                    "values": df[var.nom],
-                    "type": var.type_variable
-                }
-
-        # 3. Tests de normalité pour les variables numériques
-        normality_tests = {}
-        for var_name, data in numeric_vars.items():
-            values = data['values'].dropna()
-
-            if len(values) > 3:  # Minimum 3 valeurs pour les tests
-                # Test Shapiro-Wilk
-                shapiro_test = stats.shapiro(values)
-
-                # Test Kolmogorov-Smirnov
-                ks_test = stats.kstest(values, 'norm', args=(values.mean(), values.std()))
-
-                normality_tests[var_name] = {
-                    "shapiro_p": shapiro_test.pvalue,
-                    "ks_p": ks_test.pvalue
-                }
-
-        # 4. Générer un résumé textuel
-        summary = "Rapport d'Analyse Exploratoire\n"
-        summary += "=" * 40 + "\n\n"
-        summary += f"Nombre total d'enregistrements: {total_records}\n"
-        summary += f"Nombre de variables: {len(df.columns) - 1}\n\n"
-
-        summary += "Variables Numériques:\n"
-        summary += "-" * 40 + "\n"
-        for var_name in numeric_vars:
-            n_missing = df[var_name].isna().sum()
-            p_missing = (n_missing / total_records) * 100
-            summary += f"{var_name}: {len(df[var_name].dropna())} valeurs, {p_missing:.1f}% manquants\n"
-        summary += "\n"
-
-        summary += "Variables Catégorielles:\n"
-        summary += "-" * 40 + "\n"
-        for var in self.variables:
-            if var.type_variable in ["CATEGORIELLE", "BINAIRE", "CATEGORIELLE_MULTIPLE"]:
-                n_missing = df[var.nom].isna().sum() if var.nom in df.columns else total_records
-                p_missing = (n_missing / total_records) * 100
-                summary += f"{var.nom}: {p_missing:.1f}% manquants\n"
-
-        # Préparer le rapport final
-        report = {
-            "summary": summary,
-            "missing_data": missing_data,
-            "numeric_vars": numeric_vars,
-            "normality_tests": normality_tests,
-            "total_records": total_records
-        }
-
-        return report
-
 
 if __name__ == "__main__":
+    # Processus des tests de normalité dans un exécutable figé (PyInstaller, cx_Freeze)
+    import multiprocessing
+    multiprocessing.freeze_support()
+    # EXDFORM_TRACE=1 (ou un chemin de fichier) : trace des opérations écrite à la fermeture
+    enable_from_environment()
     app = QApplication(sys.argv)
     window = ExDForm()
     window.show()
@@ -0,0 +1,97 @@
+# Panneau "Performances" : durée, lignes et pic mémoire du processus des opérations mesurées (voir instrumentation.py).
+from PyQt6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QCheckBox, QPushButton, QTableWidget, QTableWidgetItem, QHeaderView,
+    QFileDialog, QMessageBox
+)
+from PyQt6.QtCore import Qt, QTimer
+
+from instrumentation import TRACER, TRACE_FILE_NAME
+
+REFRESH_INTERVAL_MS = 1000
+COLUMNS = ("Opération", "Appels", "Total (ms)", "Max (ms)", "Dernier (ms)", "Lignes", "Pic mémoire du processus (Mo)")
+
+
+class PerformancePanel(QDialog):
+    """Fenêtre non modale, rafraîchie chaque seconde tant qu'elle est visible"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Performances")
+        self.setGeometry(200, 200, 800, 400)
+
+        layout = QVBoxLayout()
+        self.enable_checkbox = QCheckBox("Mesurer les opérations (durée, lignes traitées, pic mémoire)")
+        self.enable_checkbox.setChecked(TRACER.enabled)
+        self.enable_checkbox.toggled.connect(self.toggle_tracing)
+        layout.addWidget(self.enable_checkbox)
+
+        self.table = QTableWidget(0, len(COLUMNS))
+        self.table.setHorizontalHeaderLabels(COLUMNS)
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        self.table.verticalHeader().setVisible(False)
+        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        layout.addWidget(self.table)
+
+        buttons = QHBoxLayout()
+        btn_clear = QPushButton("Effacer")
+        btn_clear.clicked.connect(self.clear)
+        btn_save = QPushButton("Enregistrer la trace...")
+        btn_save.clicked.connect(self.save_trace)
+        btn_close = QPushButton("Fermer")
+        btn_close.clicked.connect(self.close)
+        buttons.addWidget(btn_clear)
+        buttons.addWidget(btn_save)
+        buttons.addStretch()
+        buttons.addWidget(btn_close)
+        layout.addLayout(buttons)
+        self.setLayout(layout)
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(REFRESH_INTERVAL_MS)
+        self.timer.timeout.connect(self.refresh)
+        self.refresh()
+
+    def showEvent(self, event):
+        self.timer.start()
+        self.refresh()
+        super().showEvent(event)
+
+    def hideEvent(self, event):
+        self.timer.stop()
+        super().hideEvent(event)
+
+    def toggle_tracing(self, checked):
+        if checked:
+            TRACER.enable()
+        else:
+            TRACER.disable()
+
+    def refresh(self):
+        summary = TRACER.summary()
+        self.table.setRowCount(len(summary))
+        for row, (name, entry) in enumerate(summary.items()):
+            values = [name, entry["calls"], entry["total_ms"], entry["max_ms"], entry["last_ms"],
+                      entry.get("rows"), entry.get("process_peak_mb")]
+            for column, value in enumerate(values):
+                if value is None:
+                    text = ""
+                elif isinstance(value, float):
+                    text = f"{value:.1f}"
+                else:
+                    text = str(value)
+                item = QTableWidgetItem(text)
+                if column > 0:
+                    item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+                self.table.setItem(row, column, item)
+
+    def clear(self):
+        TRACER.clear()
+        self.refresh()
+
+    def save_trace(self):
+        file_path, _ = QFileDialog.getSaveFileName(self, "Enregistrer la trace", TRACER.path or TRACE_FILE_NAME,
+                                                   "Trace JSON (*.json)")
+        if file_path:
+            TRACER.write(file_path)
+            QMessageBox.information(self, "Succès",
+                                    f"Trace enregistrée dans {file_path}\n(lisible dans chrome://tracing ou Perfetto)")
@@ -0,0 +1,224 @@
+# Consultation des enregistrements de la base, page par page.
+# Le modèle ne charge que les pages atteintes par le défilement (pagination par clé sur id)
+# et ne décode le JSON que des lignes affichées : l'ouverture est immédiate sur des millions de lignes.
+# La recherche plein texte (index FTS5 des variables TEXTE) restreint le tableau aux enregistrements trouvés.
+import time
+from collections import OrderedDict
+
+from PyQt6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QPushButton, QTableView, QHeaderView, QMessageBox
+)
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex, pyqtSignal
+
+from core import (
+    BROWSER_PAGE_SIZE, count_records, fetch_record_page, fetch_records_by_id, decode_record, update_record,
+    column_index, search_text
+)
+from field_rules import convert_text
+
+# Lignes décodées gardées en mémoire (quelques écrans)
+DECODED_CACHE_SIZE = 1000
+
+
+class RecordTableModel(QAbstractTableModel):
+    """Enregistrements chargés à la demande ; la première colonne est l'identifiant.
+
+    Si ids est donné (résultats d'une recherche), seuls ces enregistrements sont affichés.
+    """
+
+    failed = pyqtSignal(str)
+
+    def __init__(self, db_client, mode, variables, columns, ids=None, parent=None):
+        super().__init__(parent)
+        self.db_client = db_client
+        self.mode = mode
+        self.variables = variables
+        self.columns = columns
+        self.ids = ids
+        self.index_by_column = column_index(variables)
+        self.rows = []  # [id, contenu] ; contenu non décodé en mode JSON
+        self.row_by_id = {}
+        self.decoded = OrderedDict()
+        self.exhausted = bool(ids is not None and not ids)
+        self.loading = False
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.columns) + 1
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        if orientation == Qt.Orientation.Horizontal:
+            return "id" if section == 0 else self.columns[section - 1]
+        return None
+
+    def record(self, row):
+        """Contenu décodé de la ligne row, gardé parmi les dernières lignes affichées"""
+        record_id, content = self.rows[row]
+        record = self.decoded.get(record_id)
+        if record is None:
+            record = decode_record(content)
+            self.decoded[record_id] = record
+            if len(self.decoded) > DECODED_CACHE_SIZE:
+                self.decoded.popitem(last=False)
+        else:
+            self.decoded.move_to_end(record_id)
+        return record
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or role not in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole):
+            return None
+        if index.column() == 0:
+            return self.rows[index.row()][0]
+        value = self.record(index.row()).get(self.columns[index.column() - 1])
+        return "" if value is None else str(value)
+
+    def flags(self, index):
+        flags = super().flags(index)
+        if index.isValid() and index.column() > 0:
+            flags |= Qt.ItemFlag.ItemIsEditable
+        return flags
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self.exhausted
+
+    def fetchMore(self, parent=QModelIndex()):
+        """Demande la page suivante au thread base de données (une seule à la fois)"""
+        if parent.isValid() or self.loading or self.exhausted:
+            return
+        self.loading = True
+        if self.ids is not None:
+            ids = self.ids[len(self.rows):len(self.rows) + BROWSER_PAGE_SIZE]
+            self.exhausted = len(self.rows) + len(ids) >= len(self.ids)
+            self.db_client.submit(fetch_records_by_id, self.mode, ids,
+                                  on_done=self.append_page, on_error=self.on_fetch_error)
+            return
+        after_id = self.rows[-1][0] if self.rows else 0
+        self.db_client.submit(fetch_record_page, self.mode, after_id, BROWSER_PAGE_SIZE,
+                              on_done=self.append_page, on_error=self.on_fetch_error)
+
+    def append_page(self, page):
+        self.loading = False
+        if self.ids is None and len(page) < BROWSER_PAGE_SIZE:
+            self.exhausted = True
+        if not page:
+            return
+        first = len(self.rows)
+        self.beginInsertRows(QModelIndex(), first, first + len(page) - 1)
+        for row, (record_id, content) in enumerate(page, start=first):
+            self.rows.append([record_id, content])
+            self.row_by_id[record_id] = row
+        self.endInsertRows()
+
+    def on_fetch_error(self, error):
+        self.loading = False
+        self.exhausted = True
+        self.failed.emit(f"Erreur de lecture : {error}")
+
+    def setData(self, index, value, role=Qt.ItemDataRole.EditRole):
+        """Valide la saisie avec les règles du formulaire (field_rules), puis l'écrit dans le thread base de données"""
+        if not index.isValid() or index.column() == 0 or role != Qt.ItemDataRole.EditRole:
+            return False
+        column = self.columns[index.column() - 1]
+        var = self.index_by_column.get(column)
+        try:
+            converted = convert_text(var, str(value))
+        except ValueError as e:
+            self.failed.emit(f"{column}: {e}")
+            return False
+        if self.data(index) == ("" if converted is None else str(converted)):
+            return False
+
+        record_id = self.rows[index.row()][0]
+        self.db_client.submit(update_record, self.mode, self.variables, record_id, column, converted,
+                              on_done=lambda content: self.replace_record(record_id, content),
+                              on_error=lambda e: self.failed.emit(f"{column}: {e}"))
+        return True
+
+    def replace_record(self, record_id, content):
+        row = self.row_by_id.get(record_id)
+        if row is None or content is None:
+            return
+        self.rows[row][1] = content
+        self.decoded.pop(record_id, None)
+        self.dataChanged.emit(self.index(row, 1), self.index(row, len(self.columns)))
+
+
+class RecordBrowserDialog(QDialog):
+    """Fenêtre non modale : la saisie continue pendant la consultation"""
+
+    def __init__(self, db_client, mode, variables, columns, total, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Données enregistrées")
+        self.setGeometry(150, 150, 1000, 600)
+        self.db_client = db_client
+        self.mode = mode
+        self.variables = variables
+        self.columns = columns
+
+        layout = QVBoxLayout()
+        self.search_edit = QLineEdit()
+        self.search_edit.setPlaceholderText("Rechercher dans les champs texte (Entrée pour lancer)")
+        self.search_edit.returnPressed.connect(self.search)
+        layout.addWidget(self.search_edit)
+        self.count_label = QLabel()
+        layout.addWidget(self.count_label)
+
+        self.table = QTableView()
+        # Hauteur de ligne fixe : Qt n'a pas à mesurer chaque ligne pour défiler
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        self.table.verticalHeader().setVisible(False)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Interactive)
+        self.table.horizontalHeader().setDefaultSectionSize(120)
+        layout.addWidget(self.table)
+
+        buttons = QHBoxLayout()
+        btn_refresh = QPushButton("Actualiser")
+        btn_refresh.clicked.connect(self.refresh)
+        btn_close = QPushButton("Fermer")
+        btn_close.clicked.connect(self.close)
+        buttons.addStretch()
+        buttons.addWidget(btn_refresh)
+        buttons.addWidget(btn_close)
+        layout.addLayout(buttons)
+        self.setLayout(layout)
+
+        self.set_model(total)
+
+    def set_model(self, total, ids=None):
+        self.model = RecordTableModel(self.db_client, self.mode, self.variables, self.columns, ids, self)
+        self.model.failed.connect(self.show_error)
+        self.table.setModel(self.model)
+        self.count_label.setText(f"{total} enregistrement(s) — {len(self.columns)} colonne(s)")
+        self.model.fetchMore()
+
+    def refresh(self):
+        if self.search_edit.text().strip():
+            self.search()
+            return
+        self.db_client.submit(count_records, self.mode, on_done=self.set_model,
+                              on_error=lambda e: self.show_error(f"Erreur de lecture : {e}"))
+
+    def search(self):
+        text = self.search_edit.text().strip()
+        if not text:
+            self.refresh()
+            return
+        start = time.perf_counter()
+
+        def show_results(ids):
+            if ids is None:
+                self.show_error("Aucun index plein texte : le tableau de variables ne contient pas de variable TEXTE.")
+                return
+            elapsed = (time.perf_counter() - start) * 1000
+            self.set_model(len(ids), ids)
+            self.count_label.setText(f"{len(ids)} résultat(s) pour « {text} » en {elapsed:.0f} ms")
+
+        self.db_client.submit(search_text, text, on_done=show_results,
+                              on_error=lambda e: self.show_error(f"Erreur de recherche : {e}"))
+
+    def show_error(self, message):
+        QMessageBox.warning(self, "Avertissement", message)
@@ -1,16 +1,31 @@
+import importlib.util
+
 from setuptools import setup
 
+# Formats d'export facultatifs : intégrés à l'exécutable figé seulement s'ils sont installés
+OPTIONAL_INCLUDES = [name for name in ('pyarrow', 'openpyxl') if importlib.util.find_spec(name)]
+
 setup(
     name="ExDForm",
     version="1.0",
     author="exact_data",
     description="Application de creation d'un formulaire de saisie dynamique de donnée",
+    py_modules=['main', 'core', 'cli', 'form_fields', 'field_rules', 'analysis_dialog', 'record_browser',
+                'instrumentation', 'performance_panel'],
+    # Formats facultatifs : l'application signale le paquet manquant à l'utilisation
+    extras_require={
+        'parquet': ['pyarrow'],
+        'excel': ['openpyxl'],
+    },
+    entry_points={
+        'console_scripts': ['exdform=cli:main'],
+    },
     options={
         'build_exe': {
             'includes': [
                 'PyQt6', 'pandas', 'docx',
-                'scipy', 'sqlite3', 'numpy'
-            ],
+                'scipy', 'sqlite3', 'numpy', 'matplotlib'
+            ] + OPTIONAL_INCLUDES,
             'include_files': ['assets/']
         }
     }